@@ -1,108 +1,633 @@
 import sys
 import os
-import glob
+import bisect
+import shutil
+import sqlite3
+import time
+from collections import OrderedDict
 import requests
-from io import BytesIO
-from bs4 import BeautifulSoup
-from PIL import Image, UnidentifiedImageError
 from PyQt5 import QtGui
-from PyQt5.QtWidgets import QLineEdit, QVBoxLayout, QApplication, QGridLayout, QMessageBox, QScrollArea, QMainWindow, QPushButton, QWidget, QHBoxLayout, QLabel, QSlider, QFileDialog, QStatusBar, QComboBox, QProgressBar, QSizePolicy
-from PyQt5.QtCore import QPoint, Qt, QUrl, QSize, pyqtSignal, QThread, QTimer
-from PyQt5.QtGui import QFont, QImage, QPixmap
+from PyQt5.QtWidgets import QLineEdit, QVBoxLayout, QApplication, QMessageBox, QScrollArea, QMainWindow, QPushButton, QWidget, QHBoxLayout, QLabel, QSlider, QFileDialog, QStatusBar, QComboBox, QProgressBar, QCheckBox
+from PyQt5.QtCore import QPoint, Qt, QUrl, QSize, pyqtSignal, QThread, QTimer, QObject
+from PyQt5.QtGui import QFont, QImage, QPixmap, QPainter, QColor
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
-from natsort import natsorted
-from multiprocessing import cpu_count
+from castore import ContentStore
+from downloader import Downloader
+from episodecatalog import get_catalog
+from episodepack import open_pack, split_member
+from httpclient import get_client
+from jobqueue import JobQueue, PRIORITY_BULK, PRIORITY_READAHEAD, PRIORITY_READER
+from metacache import MetadataCache
+from metrics import ACTIVE_DOWNLOADS, CACHE_LOOKUPS, DECODE_SECONDS, QUEUE_DEPTH, MetricsExporter, summary_lines
+from libraryindex import LibraryIndex, image_header_size
+from progress import ProgressStore
+from searchindex import SearchIndex
+from thumbnails import THUMBNAIL_NAME, ThumbnailStore, thumbnail_source
+from webtoonpage import TITLE_SCRIPT, fetch_episode_page, get_page_cache
 
 class DownloadThread(QThread):
-    progress_signal = pyqtSignal(str, int)
+    # GUI 쪽 얇은 껍데기: 실제 다운로드는 downloader.Downloader 가 하고 여기선 시그널로만 전달
+    # 이미지 이벤트가 아니면 percent 가 None 이므로 int 가 아니라 object 로 넘긴다
+    progress_signal = pyqtSignal(str, object)
+    # 회차 하나를 다 받을 때마다 (회차, 받은 이미지가 있는지)
+    episode_signal = pyqtSignal(int, bool)
 
-    def __init__(self, webtoon_id, webtoon_title, start_episode, end_episode, save_dir):
+    def __init__(self, webtoon_id, webtoon_title, start_episode, end_episode, save_dir, min_workers=2, max_workers=32, save_mode="passthrough", dedup=False):
         super().__init__()
-        self.webtoon_id = webtoon_id
-        self.webtoon_title = webtoon_title
-        self.start_episode = start_episode
-        self.end_episode = end_episode
-        self.save_dir = save_dir
+        store = ContentStore.for_library(save_dir) if dedup else None
+        self.downloader = Downloader(
+            webtoon_id, webtoon_title, start_episode, end_episode, save_dir,
+            min_workers=min_workers, max_workers=max_workers, save_mode=save_mode, store=store, on_progress=self.report,
+        )
+
+    @property
+    def error(self):
+        return self.downloader.error
+
+    @property
+    def error_message(self):
+        return self.downloader.error_message
+
+    @property
+    def downloaded_episodes(self):
+        return self.downloader.downloaded_episodes
+
+    @property
+    def finished_episodes(self):
+        return self.downloader.finished_episodes
+
+    def report(self, event):
+        self.progress_signal.emit(event["message"], event.get("percent"))
+        if event["event"] == "episode_done":
+            self.episode_signal.emit(event["episode"], event["images"] > 0)
+
+    def run(self):
+        self.downloader.run()
+
+class DownloadRequest(QObject):
+    # 호출한 쪽에서 본 요청 하나 (여러 회차일 수 있음). 회차들이 다 끝나면 finished
+    progress_signal = pyqtSignal(str, object)
+    finished = pyqtSignal()
+
+    def __init__(self, keys):
+        super().__init__()
+        self.keys = set(keys)
+        self.remaining = set(keys)
         self.downloaded_episodes = []
-        self.total_images = 0
-        self.downloaded_images = 0
+        self.succeeded = False
+        self.error = False
+        self.error_message = ""
+        self.percent = 0
+
+    def report(self, message, percent, batch_size):
+        if percent is not None:
+            done = len(self.keys) - len(self.remaining)
+            value = int((done + percent / 100 * batch_size) / len(self.keys) * 100)
+            self.percent = max(self.percent, min(value, 100))
+            percent = self.percent
+        self.progress_signal.emit(message, percent)
+
+    def episode_done(self, key, downloaded, error_message=""):
+        self.remaining.discard(key)
+        if downloaded:
+            self.downloaded_episodes.append(key[2])
+        if error_message:
+            self.error_message = error_message
+        else:
+            self.succeeded = True
+        if not self.remaining:
+            # 받은 회차가 하나라도 있으면 요청 전체는 성공
+            self.error = not self.succeeded
+            self.downloaded_episodes.sort()
+            self.finished.emit()
+
+class DownloadScheduler(QObject):
+    # 모든 다운로드는 여기로: 우선순위 큐에서 회차를 꺼내 최대 max_active 개의 DownloadThread 로 받는다
+    def __init__(self, queue, download_options, max_active=3, batch_episodes=10):
+        super().__init__()
+        self.queue = queue
+        self.download_options = download_options
+        self.max_active = max(2, max_active)
+        self.batch_episodes = batch_episodes
+        self.threads = {}
+        self.requests = []
+
+    def submit(self, save_dir, title_id, title, start_episode, end_episode, priority=PRIORITY_BULK, persist=False):
+        keys = self.queue.add_range(save_dir, title_id, title, start_episode, end_episode, priority, persist)
+        return self.watch(keys)
+
+    def resume(self):
+        # 지난 실행에서 못 끝낸 범위 다운로드
+        if not self.queue.jobs:
+            return None
+        return self.watch(list(self.queue.jobs))
+
+    def watch(self, keys):
+        request = DownloadRequest(keys)
+        self.requests.append(request)
+        self.pump()
+        return request
+
+    def is_pending(self, save_dir, title_id, episode):
+        return self.queue.is_pending(save_dir, title_id, episode)
+
+    def pump(self):
+        try:
+            self.start_jobs()
+        finally:
+            QUEUE_DEPTH.set(len(self.queue.jobs), queue="jobs")
+            ACTIVE_DOWNLOADS.set(len(self.threads))
+
+    def start_jobs(self):
+        while len(self.threads) < self.max_active:
+            job = self.queue.peek()
+            if job is None:
+                return
+            # 마지막 한 자리는 독자가 기다리는 회차 몫으로 비워둔다
+            if job["priority"] > PRIORITY_READER and len(self.threads) >= self.max_active - 1:
+                return
+            job, keys = self.queue.take_batch(1 if job["priority"] == PRIORITY_READER else self.batch_episodes)
+            thread = DownloadThread(job["title_id"], job["title"], keys[0][2], keys[-1][2], job["save_dir"], **self.download_options())
+            thread.progress_signal.connect(lambda message, percent, keys=keys: self.forward_progress(keys, message, percent))
+            thread.episode_signal.connect(lambda episode, downloaded, thread=thread: self.episode_finished(thread, episode, downloaded))
+            thread.finished.connect(lambda thread=thread: self.thread_finished(thread))
+            self.threads[thread] = keys
+            thread.start()
+
+    def watchers(self, keys):
+        return [request for request in self.requests if request.remaining & set(keys)]
+
+    def forward_progress(self, keys, message, percent):
+        for request in self.watchers(keys):
+            request.report(message, percent, len(request.remaining & set(keys)))
+
+    def episode_finished(self, thread, episode, downloaded):
+        # 묶음 안의 다른 회차를 기다리지 않고 이 회차를 기다리던 요청(독자가 보려는 회차)을 바로 끝낸다
+        keys = [key for key in self.threads.get(thread, []) if key[2] == episode]
+        for request in self.watchers(keys):
+            for key in keys:
+                if key in request.remaining:
+                    request.episode_done(key, downloaded, "" if downloaded else f"{episode}화 이미지를 받지 못했습니다.")
+        self.requests = [request for request in self.requests if request.remaining]
+
+    def thread_finished(self, thread):
+        keys = self.threads.pop(thread)
+        finished = set(thread.finished_episodes)
+        self.queue.finish(keys, {key for key in keys if key[2] in finished})
+        downloaded = set(thread.downloaded_episodes)
+        for request in self.watchers(keys):
+            for key in keys:
+                if key in request.remaining:
+                    request.episode_done(key, key[2] in downloaded, thread.error_message if thread.error else "")
+        self.requests = [request for request in self.requests if request.remaining]
+        self.pump()
+
+class MetadataRefreshThread(QThread):
+    metadata_signal = pyqtSignal(str, dict)
+
+    def __init__(self, cache, titles):
+        super().__init__()
+        self.cache = cache
+        self.titles = titles
 
     def run(self):
-        session = requests.Session()
-        headers = {"User-Agent": "Mozilla/5.0"}
-        max_workers = cpu_count() // 2
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            episode_futures = []
-            for episode in range(self.start_episode, self.end_episode + 1):
-                episode_dir = os.path.join(self.save_dir, f"{self.webtoon_title}_{self.webtoon_id}")
-                os.makedirs(episode_dir, exist_ok=True)
-
-                # 썸네일 이미지 다운로드 (첫 회차만)
-                if episode == self.start_episode:
-                    list_url = f"https://comic.naver.com/webtoon/list?titleId={self.webtoon_id}"
-                    try:
-                        res = session.get(list_url, headers=headers)
-                        soup = BeautifulSoup(res.text, 'html.parser')
-                        image_url = soup.find("meta", {"property": "og:image"})["content"]
-                        if image_url:
-                            thumb_data = session.get(image_url, headers=headers).content
-                            thumb_path = os.path.join(episode_dir, "thumbnail.jpg")
-                            with open(thumb_path, "wb") as f:
-                                f.write(thumb_data)
-                    except Exception as e:
-                        print("썸네일 다운로드 실패:", e)
-                if self.is_episode_downloaded(episode_dir, episode):
+        client = get_client()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {}
+            for title_id, title_dir in self.titles:
+                # 폴더에 thumbnail.jpg 가 있으면 썸네일은 다시 받지 않는다
+                thumbnail = not os.path.isfile(os.path.join(title_dir, THUMBNAIL_NAME))
+                futures[executor.submit(self.cache.fetch, client, title_id, thumbnail)] = title_id
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    # 한 웹툰의 페이지가 이상해도 나머지 갱신과 캐시 저장은 계속한다
+                    print("메타데이터 갱신 실패:", futures[future], e)
                     continue
-                url = f"https://comic.naver.com/webtoon/detail?titleId={self.webtoon_id}&no={episode}"
-                episode_future = executor.submit(self.download_episode, session, headers, episode, url, episode_dir)
-                episode_futures.append(episode_future)
-
-            for episode_future in concurrent.futures.as_completed(episode_futures):
-                episode, downloaded_images = episode_future.result()
-                if self.total_images == 0:
-                    QMessageBox.warning(None, "Warning", "저장 할 수 없는 웹툰입니다.")
-                    return
-                if episode is not None:
-                    self.downloaded_images += downloaded_images
-                    self.progress_signal.emit(f"{episode}화 다운로드 완료: {downloaded_images}장", None)
-                    progress_ratio = self.downloaded_images / self.total_images * 100
-                    self.progress_signal.emit(f"Progress: {self.downloaded_images}/{self.total_images}  ({progress_ratio:.1f}%)", int(progress_ratio))
-                if downloaded_images > 0:
-                    self.downloaded_episodes.append(episode)
-        self.downloaded_episodes.sort()
-        self.progress_signal.emit("다운로드 완료.", None)
-
-    def is_episode_downloaded(self, episode_dir, episode):
-        filename_pattern = f"{self.webtoon_title}_{self.webtoon_id}_{episode}_*.jpg"
-        return len(glob.glob(os.path.join(episode_dir, filename_pattern))) > 0
-
-    def download_episode(self, session, headers, episode, url, episode_dir):
-        response = session.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title_tag = soup.find('a', class_='title')
-        if not title_tag:
-            return episode, 0
-        webtoon_title = title_tag.text.strip()
-        img_tags = soup.select('img[src*="image-comic.pstatic.net/webtoon/"]')
-        img_urls = [img['src'] for img in img_tags if "IMAG01" in img['src']]
-        if not img_urls:
-            return episode, 0
-        self.total_images += len(img_urls)
-        self.progress_signal.emit(f"{episode}화 이미지 {len(img_urls)}장 다운로드 시작", None)
-        downloaded_images = 0
-        for i, img_url in enumerate(img_urls):
-            response = session.get(img_url, headers=headers)
+                self.metadata_signal.emit(futures[future], entry)
+        self.cache.save()
+
+class TitleLookupThread(QThread):
+    # 캐시에도 화면에도 제목이 없을 때만 회차 페이지를 GUI 밖에서 받아 제목을 찾는다
+    title_signal = pyqtSignal(str, str, str, str)
+
+    def __init__(self, webtoon_id, episode_no):
+        super().__init__()
+        self.webtoon_id = webtoon_id
+        self.episode_no = episode_no
+
+    def run(self):
+        try:
+            webtoon_title = fetch_episode_page(get_client(), self.webtoon_id, self.episode_no)["title"]
+        except Exception as e:
+            self.title_signal.emit(self.webtoon_id, self.episode_no, "", str(e))
+            return
+        self.title_signal.emit(self.webtoon_id, self.episode_no, webtoon_title, "")
+
+class CatalogThread(QThread):
+    catalog_signal = pyqtSignal(str, object)
+
+    def __init__(self, catalog, title_id, upto=None):
+        super().__init__()
+        self.catalog = catalog
+        self.title_id = str(title_id)
+        self.upto = upto
+
+    def run(self):
+        try:
+            episode_list = self.catalog.get(get_client(), self.title_id, self.upto)
+        except Exception as e:
+            print("회차 목록 가져오기 실패:", self.title_id, e)
+            episode_list = None
+        self.catalog_signal.emit(self.title_id, episode_list)
+
+def load_library(root):
+    index = LibraryIndex(root)
+    store = ProgressStore(root)
+    if not store.exists:
+        # 처음 한 번만 웹툰 폴더마다 있던 last_read.txt 를 옮겨온다
+        store.migrate_legacy((title_id, os.path.join(root, dirname)) for title_id, _, dirname in index.titles())
+        store.flush()
+    return index, store
+
+class LibraryLoadThread(QThread):
+    # 색인 열기(처음이면 폴더 스캔)와 제목 목록 읽기를 GUI 밖에서 하고 나눠서 넘겨준다
+    library_signal = pyqtSignal(object, object)
+    titles_signal = pyqtSignal(list)
+
+    def __init__(self, root, metadata_cache, index=None, progress_store=None, batch_size=200):
+        super().__init__()
+        self.root = root
+        self.metadata_cache = metadata_cache
+        self.index = index
+        self.progress_store = progress_store
+        self.batch_size = batch_size
+
+    def run(self):
+        if self.index is None:
             try:
-                image = Image.open(BytesIO(response.content))
-            except UnidentifiedImageError:
+                self.index, self.progress_store = load_library(self.root)
+            except (OSError, sqlite3.Error) as e:
+                print("저장된 웹툰 목록 불러오기 실패:", e)
+                return
+        self.library_signal.emit(self.index, self.progress_store)
+        batch = []
+        for title_id, title, dirname in self.index.titles():
+            metadata = self.metadata_cache.get(title_id) or {}
+            batch.append({
+                "title_id": title_id,
+                "title": title,
+                "path": os.path.join(self.root, dirname),
+                "description": metadata.get("description", ""),
+            })
+            if len(batch) >= self.batch_size:
+                self.titles_signal.emit(batch)
+                batch = []
+        if batch:
+            self.titles_signal.emit(batch)
+
+def parse_webtoon_url(url):
+    if "titleId" in url and "no" in url:
+        webtoon_id = url.split("titleId=")[1].split("&")[0]
+        episode_no = url.split("no=")[1].split("&")[0]
+        return webtoon_id, episode_no
+    return None, None
+
+def load_image(path):
+    # episode pack 안의 이미지는 mmap 조각에서 바로 디코드
+    member = split_member(path)
+    if member is None:
+        return QImage(path)
+    try:
+        data = open_pack(member[0]).view(member[1])
+    except (OSError, ValueError, IndexError) as e:
+        print("episode pack 읽기 실패:", path, e)
+        return QImage()
+    # 디코드가 끝나면 조각을 놓아 pack 을 닫을 수 있게
+    with data:
+        return QImage.fromData(data)
+
+class DecodedImageCache(QObject):
+    # 디코드된 이미지를 메모리 한도 안에서 LRU로 보관, 디코드는 백그라운드 스레드에서
+    decoded_signal = pyqtSignal(str, QImage)
+    image_ready = pyqtSignal(str)
+    cache_name = "image"
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024, workers=2):
+        super().__init__()
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.pending = set()
+        self.failed = set()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.decoded_signal.connect(self.store)
+
+    def get(self, path):
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        self.entries.move_to_end(path)
+        return entry[0]
+
+    def record_lookup(self, path):
+        # 적중률은 다시 그릴 때마다가 아니라 이미지가 화면에 들어올 때 한 번, 이미 디코드돼 있었는지로 센다
+        if path in self.entries:
+            CACHE_LOOKUPS.inc(cache=self.cache_name, result="hit")
+        else:
+            CACHE_LOOKUPS.inc(cache=self.cache_name, result="miss")
+
+    def request(self, path):
+        if path in self.entries or path in self.pending or path in self.failed:
+            return
+        self.pending.add(path)
+        self.executor.submit(self.decode, path)
+
+    def decode(self, path):
+        # QImage는 GUI 스레드 밖에서 만들어도 되지만 QPixmap 변환은 GUI 스레드에서 한다
+        # 실패해도 반드시 빈 이미지를 보내서 pending 에서 빠지게 한다 (store 가 failed 로 옮긴다)
+        started = time.perf_counter()
+        try:
+            image = load_image(path)
+        except Exception as e:
+            print("이미지 디코드 실패:", path, e)
+            image = QImage()
+        DECODE_SECONDS.observe(time.perf_counter() - started, cache=self.cache_name)
+        self.decoded_signal.emit(path, image)
+
+    def store(self, path, image):
+        self.pending.discard(path)
+        if image.isNull():
+            self.failed.add(path)
+            return
+        size = image.sizeInBytes()
+        self.entries[path] = (QPixmap.fromImage(image), size)
+        self.used_bytes += size
+        while self.used_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.used_bytes -= old_size
+        self.image_ready.emit(path)
+
+class ThumbnailCache(DecodedImageCache):
+    # 썸네일은 원본 대신 디스크에 만들어 둔 작은 사본을 디코드
+    cache_name = "thumbnail"
+
+    def __init__(self, thumbnails, budget_bytes=32 * 1024 * 1024, workers=2):
+        super().__init__(budget_bytes, workers)
+        self.thumbnails = thumbnails
+
+    def decode(self, path):
+        started = time.perf_counter()
+        try:
+            variant = self.thumbnails.get(path)
+        except Exception as e:
+            print("썸네일 생성 실패:", path, e)
+            variant = None
+        image = QImage(variant) if variant else QImage()
+        DECODE_SECONDS.observe(time.perf_counter() - started, cache=self.cache_name)
+        self.decoded_signal.emit(path, image)
+
+    def forget(self, path):
+        self.failed.discard(path)
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.used_bytes -= entry[1]
+
+class EpisodeStrip(QWidget):
+    # 회차 이미지를 세로로 이어 그리는 가상 화면: 전체 높이는 미리 계산하고 화면 근처 이미지만 디코드를 요청한다
+    # 연속 스크롤 모드에서는 여러 회차를 위아래로 붙여서 들고 있는다
+    def __init__(self, image_cache, parent=None, keep_screens=2):
+        super().__init__(parent)
+        self.image_cache = image_cache
+        self.image_cache.image_ready.connect(self.on_image_ready)
+        self.keep_screens = keep_screens
+        self.segments = []
+        self.items = []
+        self.tops = []
+        self.path_index = {}
+        # 화면에 들어와서 캐시 적중 여부를 이미 센 이미지 (화면 밖으로 나가면 빠진다)
+        self.shown = set()
+
+    def set_episode(self, episode, rows):
+        self.segments = [(episode, layout_items(rows))]
+        self.relayout()
+
+    def append_episode(self, episode, rows):
+        self.segments.append((episode, layout_items(rows)))
+        self.relayout()
+
+    def prepend_episode(self, episode, rows):
+        items = layout_items(rows)
+        self.segments.insert(0, (episode, items))
+        self.relayout()
+        return segment_height(items)
+
+    def remove_episodes_except(self, keep):
+        # 잘라낸 회차 중 위쪽에 있던 높이를 돌려줘서 스크롤 위치를 보정할 수 있게 한다
+        removed_above = 0
+        segments = []
+        for episode, items in self.segments:
+            if episode in keep:
+                segments.append((episode, items))
+            elif not segments:
+                removed_above += segment_height(items)
+        if len(segments) != len(self.segments):
+            self.segments = segments
+            self.relayout()
+        return removed_above
+
+    def episodes(self):
+        return [episode for episode, _ in self.segments]
+
+    def has_episode(self, episode):
+        return episode in self.episodes()
+
+    def episode_span(self, episode):
+        top = 0
+        for segment_episode, items in self.segments:
+            if segment_episode == episode:
+                return top, segment_height(items)
+            top += segment_height(items)
+        return 0, 0
+
+    def relayout(self):
+        self.items = []
+        top = 0
+        for episode, items in self.segments:
+            for index, item in enumerate(items):
+                self.items.append(dict(item, top=top + item["top"], episode=episode, index=index))
+            top += segment_height(items)
+        self.tops = [item["top"] for item in self.items]
+        self.path_index = {item["path"]: index for index, item in enumerate(self.items)}
+        max_width = max((item["width"] for item in self.items), default=0)
+        self.setMinimumSize(max_width, top)
+        # 스크롤 영역이 바로 새 높이를 알아야 스크롤 위치 보정이 잘리지 않는다
+        self.resize(max(self.width(), max_width), top)
+        self.update()
+
+    def offset_of(self, episode, index):
+        for item in self.items:
+            if item["episode"] == episode and item["index"] == index:
+                return item["top"]
+        return self.episode_span(episode)[0]
+
+    def index_at(self, y):
+        if not self.items:
+            return None
+        return max(0, bisect.bisect_right(self.tops, y) - 1)
+
+    def item_at(self, y):
+        index = self.index_at(y)
+        return None if index is None else self.items[index]
+
+    def indexes_between(self, top, bottom):
+        if not self.items:
+            return range(0)
+        return range(self.index_at(top), min(len(self.items), bisect.bisect_right(self.tops, bottom)))
+
+    def update_viewport(self, top, bottom):
+        self.shown &= {self.items[index]["path"] for index in self.indexes_between(top, bottom)}
+        margin = (bottom - top) * self.keep_screens
+        for index in self.indexes_between(top - margin, bottom + margin):
+            self.image_cache.request(self.items[index]["path"])
+
+    def on_image_ready(self, path):
+        index = self.path_index.get(path)
+        if index is not None:
+            item = self.items[index]
+            self.update(0, item["top"], self.width(), item["height"])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = event.rect()
+        for index in self.indexes_between(rect.top(), rect.bottom()):
+            item = self.items[index]
+            x = max(0, (self.width() - item["width"]) // 2)
+            if item["path"] not in self.shown:
+                self.shown.add(item["path"])
+                self.image_cache.record_lookup(item["path"])
+            pixmap = self.image_cache.get(item["path"])
+            if pixmap is None:
+                self.image_cache.request(item["path"])
+                painter.fillRect(x, item["top"], item["width"], item["height"], QColor(40, 40, 40))
                 continue
-            filename = f"{webtoon_title}_{self.webtoon_id}_{episode}_{i + 1}.jpg"
-            image.save(os.path.join(episode_dir, filename))
-            downloaded_images += 1
-        return episode, downloaded_images
+            painter.drawPixmap(x, item["top"], pixmap)
+
+def segment_height(items):
+    return items[-1]["top"] + items[-1]["height"] if items else 0
+
+def layout_items(rows, max_height=None):
+    items = []
+    top = 0
+    for path, width, height, _ in rows:
+        if max_height is not None and top >= max_height:
+            break
+        if not width or not height:
+            width, height = image_header_size(path)
+            if not width or not height:
+                continue
+        items.append({"path": path, "top": top, "width": width, "height": height})
+        top += height
+    return items
+
+class LibraryView(QWidget):
+    # 카드 높이가 고정이라 위치는 계산으로 구하고, 화면 근처 카드만 실제 위젯으로 만든다
+    def __init__(self, scroll_area, make_card, card_height=180, spacing=15, margin=10, overscan=3):
+        super().__init__()
+        self.scroll_area = scroll_area
+        self.make_card = make_card
+        self.card_height = card_height
+        self.spacing = spacing
+        self.margin = margin
+        self.overscan = overscan
+        self.entries = []
+        self.entry_by_id = {}
+        self.visible_entries = []
+        self.search_index = SearchIndex()
+        self.query = ""
+        self.query_results = None
+        self.cards = {}
+        scroll_area.verticalScrollBar().valueChanged.connect(self.update_cards)
+
+    def add_entries(self, entries):
+        self.entries.extend(entries)
+        for entry in entries:
+            self.entry_by_id[entry["title_id"]] = entry
+            self.search_index.add(entry["title_id"], entry["title"], entry["description"])
+            if self.query_results is None:
+                self.visible_entries.append(entry)
+            elif self.search_index.match(entry["title_id"], self.query):
+                self.query_results.add(entry["title_id"])
+                self.visible_entries.append(entry)
+        self.relayout()
+
+    def remove_entry(self, title_id):
+        self.entries = [e for e in self.entries if e["title_id"] != title_id]
+        self.visible_entries = [e for e in self.visible_entries if e["title_id"] != title_id]
+        self.entry_by_id.pop(title_id, None)
+        self.search_index.remove(title_id)
+        self.drop_card(title_id)
+        self.relayout()
+
+    def set_description(self, title_id, description):
+        entry = self.entry_by_id.get(title_id)
+        if entry is not None:
+            entry["description"] = description
+            self.search_index.add(title_id, entry["title"], description)
+
+    def set_query(self, query):
+        self.query = query
+        self.query_results = self.search_index.search(query)
+        if self.query_results is None:
+            self.visible_entries = list(self.entries)
+        else:
+            self.visible_entries = [e for e in self.entries if e["title_id"] in self.query_results]
+        self.scroll_area.verticalScrollBar().setValue(0)
+        self.relayout()
+
+    def card(self, title_id):
+        return self.cards.get(title_id)
+
+    def drop_card(self, title_id):
+        card = self.cards.pop(title_id, None)
+        if card is not None:
+            card.hide()
+            card.deleteLater()
+
+    def relayout(self):
+        row_height = self.card_height + self.spacing
+        self.setMinimumHeight(self.margin * 2 + len(self.visible_entries) * row_height)
+        self.update_cards()
+
+    def update_cards(self):
+        row_height = self.card_height + self.spacing
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + self.scroll_area.viewport().height()
+        first = max(0, (top - self.margin) // row_height - self.overscan)
+        last = min(len(self.visible_entries), (bottom - self.margin) // row_height + 1 + self.overscan)
+        wanted = {}
+        for row in range(first, last):
+            wanted[self.visible_entries[row]["title_id"]] = row
+        for title_id in list(self.cards):
+            if title_id not in wanted:
+                self.drop_card(title_id)
+        width = max(0, self.width() - self.margin * 2)
+        for row in range(first, last):
+            entry = self.visible_entries[row]
+            card = self.cards.get(entry["title_id"])
+            if card is None:
+                card = self.make_card(entry)
+                card.setParent(self)
+                self.cards[entry["title_id"]] = card
+            card.setGeometry(self.margin, self.margin + row * row_height, width, self.card_height)
+            card.show()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_cards()
 
 class WebtoonViewer(QMainWindow):
     def __init__(self, alert_button):
@@ -136,11 +661,14 @@ class WebtoonViewer(QMainWindow):
     def loadFinished(self, ok):
         if ok:
             url_info = self.webview.url().toString()
-            webtoon_id, webtoon_title, episode_no = self.parse_webtoon_url(url_info)
+            webtoon_id, episode_no = parse_webtoon_url(url_info)
             if webtoon_id and episode_no:
-                self.alert_button.set_webtoon_info(webtoon_id, webtoon_title, episode_no)
+                self.alert_button.set_webtoon_info(webtoon_id, "", episode_no)
+                # 제목은 캐시 → 지금 열린 페이지 → 백그라운드 요청 순서로 찾는다
+                self.alert_button.resolve_title(webtoon_id, episode_no, self.webview.page())
             else:
                 self.alert_button.set_webtoon_info("", "", "")
+                self.alert_button.title_request = None
                 self.alert_button.save_images_button.setEnabled(False)
                 self.alert_button.webtoon_title_label.setText("Webtoon 제목:")
 
@@ -149,24 +677,21 @@ class WebtoonViewer(QMainWindow):
         zoom_factor = self.width() / 1300
         self.webview.setZoomFactor(zoom_factor)
 
-    def parse_webtoon_url(self, url):
-        if "titleId" in url and "no" in url:
-            webtoon_id = url.split("titleId=")[1].split("&")[0]
-            episode_no = url.split("no=")[1].split("&")[0]
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title_tag = soup.find('a', class_='title')
-            webtoon_title = title_tag.text.strip() if title_tag else ""
-            return webtoon_id, webtoon_title, episode_no
-        return None, None, None
-
     def start_image_download(self, webtoon_id, webtoon_title, start_episode, end_episode):
         save_dir = QFileDialog.getExistingDirectory(self, "Save Images", "")
         if save_dir:
-            self.download_thread = DownloadThread(webtoon_id, webtoon_title, start_episode, end_episode, save_dir)
-            self.download_thread.progress_signal.connect(self.update_progress)
-            self.download_thread.finished.connect(self.download_completed)
-            self.download_thread.start()
+            request = self.alert_button.download_scheduler.submit(save_dir, webtoon_id, webtoon_title, start_episode, end_episode, persist=True)
+            self.track_download(request)
+
+    def resume_downloads(self):
+        request = self.alert_button.download_scheduler.resume()
+        if request is not None:
+            self.alert_button.status_bar.showMessage("지난번에 받던 다운로드를 이어받습니다.")
+            self.track_download(request)
+
+    def track_download(self, request):
+        request.progress_signal.connect(self.update_progress)
+        request.finished.connect(lambda: self.download_completed(request))
 
     def update_progress(self, message, progress_ratio):
         print(message)
@@ -174,9 +699,12 @@ class WebtoonViewer(QMainWindow):
         if progress_ratio is not None:
             self.alert_button.progress_bar.setValue(progress_ratio)
 
-    def download_completed(self):
+    def download_completed(self, request):
         print("Download completed.")
-        self.alert_button.show_message_box(self.download_thread.downloaded_episodes)
+        if request.error:
+            QMessageBox.warning(self, "Warning", request.error_message)
+            return
+        self.alert_button.show_message_box(request.downloaded_episodes)
 
     def closeEvent(self, event):
         self.alert_button.close()
@@ -207,6 +735,14 @@ class AlertButton(QWidget):
         self.start_episode_input.setValidator(QtGui.QIntValidator())
         self.end_episode_input = QLineEdit(self)
         self.end_episode_input.setValidator(QtGui.QIntValidator())
+        self.min_workers_input = QLineEdit("2", self)
+        self.min_workers_input.setValidator(QtGui.QIntValidator(1, 256))
+        self.max_workers_input = QLineEdit("32", self)
+        self.max_workers_input.setValidator(QtGui.QIntValidator(1, 256))
+        # 호스트별 초당 요청 수 제한 (비우거나 0 이면 제한 없음)
+        self.rate_input = QLineEdit("0", self)
+        self.rate_input.setValidator(QtGui.QIntValidator(0, 10000))
+        self.rate_input.editingFinished.connect(self.apply_rate)
         self.save_images_button = QPushButton("이미지 다운로드", self)
         self.save_images_button.clicked.connect(self.save_images)
         self.save_images_button.setEnabled(False)
@@ -217,6 +753,54 @@ class AlertButton(QWidget):
         self.home_button.clicked.connect(self.go_to_home)
         self.view_saved_webtoon_button = QPushButton("저장된 웹툰 보기", self)
         self.view_saved_webtoon_button.clicked.connect(self.view_saved_webtoon)
+        self.continuous_mode_checkbox = QCheckBox("연속 스크롤 모드", self)
+        self.continuous_mode_checkbox.setChecked(True)
+        self.dedup_checkbox = QCheckBox("같은 이미지는 한 번만 저장", self)
+        # 받는 속도, 요청 지연, 큐 길이, 캐시 적중률을 1초마다 보여주는 통계 창
+        self.stats_checkbox = QCheckBox("통계 보기", self)
+        self.stats_checkbox.toggled.connect(self.toggle_stats)
+        self.stats_label = QLabel(self)
+        self.stats_label.setFont(QFont("Monospace", 8))
+        self.stats_label.setVisible(False)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_bytes = None
+        self.stats_time = None
+        self.metadata_cache = MetadataCache()
+        self.title_request = None
+        self.title_threads = set()
+        # 읽는 중인 웹툰의 회차 목록 (없는 회차/유료 회차를 건너뛰고 처음과 끝을 바로 안다)
+        self.episode_catalog = get_catalog()
+        self.viewer_catalog = None
+        self.catalog_threads = {}
+        self.library_index = None
+        self.progress_store = None
+        # 읽은 위치는 메모리에서 갱신하고 스크롤이 멈춘 뒤 한 번에 저장
+        self.progress_flush_timer = QTimer(self)
+        self.progress_flush_timer.setSingleShot(True)
+        self.progress_flush_timer.setInterval(1000)
+        self.progress_flush_timer.timeout.connect(lambda: self.progress_store.flush())
+        # 검색은 입력이 멈추고 잠깐 뒤에 한 번만
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.filter_webtoons)
+        self.image_cache = DecodedImageCache()
+        self.thumbnail_cache = ThumbnailCache(ThumbnailStore())
+        self.thumbnail_cache.image_ready.connect(self.on_thumbnail_ready)
+        # 현재 회차를 이만큼 읽으면 앞뒤 회차의 첫 화면을 미리 디코드
+        self.prefetch_ratio = 0.7
+        self.prefetch_screens = 2
+        # 현재 회차를 이만큼 읽으면 다음 회차들을 조용히 미리 다운로드
+        self.readahead_ratio = 0.5
+        self.readahead_episodes = 3
+        self.readahead_max_active = 2
+        self.readahead_disk_budget = 2 * 1024 ** 3
+        self.readahead_min_free_bytes = 1024 ** 3
+        self.readahead_queue = []
+        self.readahead_requests = set()
+        self.download_scheduler = DownloadScheduler(JobQueue(), self.download_options)
 
         layout = QVBoxLayout()
         layout.addWidget(self.toggle_transparency_button)
@@ -229,23 +813,63 @@ class AlertButton(QWidget):
         layout.addWidget(self.start_episode_input)
         layout.addWidget(QLabel("End Episode:"))
         layout.addWidget(self.end_episode_input)
+        layout.addWidget(QLabel("동시 다운로드 (최소/최대):"))
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(self.min_workers_input)
+        workers_layout.addWidget(self.max_workers_input)
+        layout.addLayout(workers_layout)
+        layout.addWidget(QLabel("초당 요청 수 제한 (0: 없음):"))
+        layout.addWidget(self.rate_input)
         layout.addWidget(self.save_images_button)
         layout.addWidget(self.home_button)
         layout.addWidget(self.view_saved_webtoon_button)
+        layout.addWidget(self.continuous_mode_checkbox)
+        layout.addWidget(self.dedup_checkbox)
+        layout.addWidget(self.stats_checkbox)
+        layout.addWidget(self.stats_label)
         layout.addWidget(self.progress_bar)
         layout.addWidget(self.status_bar)
         self.setLayout(layout)
 
+    def open_library(self, root):
+        if self.library_index is None or self.library_index.root != root:
+            self.set_library(*load_library(root))
+        return self.library_index
+
+    def set_library(self, index, progress_store):
+        if index is self.library_index:
+            return
+        if self.library_index is not None:
+            self.library_index.close()
+            self.progress_store.flush()
+        self.library_index = index
+        self.progress_store = progress_store
+
+    def toggle_stats(self, checked):
+        self.stats_label.setVisible(checked)
+        if checked:
+            self.stats_bytes = None
+            self.update_stats()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+            self.adjustSize()
+
+    def update_stats(self):
+        now = time.monotonic()
+        elapsed = now - self.stats_time if self.stats_time is not None else None
+        lines, self.stats_bytes = summary_lines(self.stats_bytes, elapsed)
+        self.stats_time = now
+        self.stats_label.setText("\n".join(lines))
+
+    def save_progress_later(self):
+        self.progress_flush_timer.start()
+
     def view_saved_webtoon(self):
         folder = QFileDialog.getExistingDirectory(self, "저장된 웹툰 폴더 선택")
         if not folder:
             return
 
-        webtoon_dirs = [d for d in os.listdir(folder) if os.path.isdir(os.path.join(folder, d))]
-        if not webtoon_dirs:
-            QMessageBox.warning(self, "경고", "해당 경로에 저장된 웹툰이 없습니다.")
-            return
-
         self.webtoon_list_window = QMainWindow(self)
         self.webtoon_list_window.setWindowTitle("저장된 웹툰 목록")
 
@@ -253,170 +877,167 @@ class AlertButton(QWidget):
         search_layout = QHBoxLayout()
         search_label = QLabel("* 저장된 웹툰 검색:")
         self.search_input = QLineEdit()
-        self.search_input.textChanged.connect(lambda: self.filter_webtoons(layout, container))
+        self.search_input.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
 
         full_container = QWidget()
         full_layout = QVBoxLayout(full_container)
         full_layout.addLayout(search_layout)
+        self.library_status_label = QLabel("웹툰 목록을 불러오는 중...")
+        full_layout.addWidget(self.library_status_label)
         self.webtoon_list_window.resize(1000, 800)
 
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        container = QWidget()
-        layout = QGridLayout(container)
-        layout.setSpacing(15)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        for dirname in sorted(webtoon_dirs):
-            if "_" not in dirname:
-                continue
-            title_parts = dirname.rsplit("_", 1)
-            if len(title_parts) != 2 or not title_parts[1].isdigit():
-                continue
-
-            title = title_parts[0]
-            title_id = title_parts[1]
-            path = os.path.join(folder, dirname)
-            meta_url = f"https://comic.naver.com/webtoon/list?titleId={title_id}"
-
-            try:
-                res = requests.get(meta_url, headers={"User-Agent": "Mozilla/5.0"})
-                soup = BeautifulSoup(res.text, 'html.parser')
-                image_url = soup.find("meta", {"property": "og:image"})["content"]
-                description = soup.find("meta", {"property": "og:description"})["content"]
-            except:
-                image_url = ""
-                description = "설명을 가져올 수 없습니다."
-
-            card = QWidget()
-            card_layout = QHBoxLayout()
-
-            thumb_label = QLabel()
-            if image_url:
-                try:
-                    thumb_data = requests.get(image_url).content
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(thumb_data)
-                    thumb_label.setPixmap(pixmap.scaled(120, 160, Qt.KeepAspectRatio))
-                except:
-                    thumb_label.setText("썸네일 오류")
-            else:
-                thumb_label.setText("썸네일 없음")
-
-            desc_label = QLabel(description)
-            desc_label.setWordWrap(True)
-            desc_label.setFixedWidth(400)
-
-            btn_layout = QVBoxLayout()
-            start_btn = QPushButton("처음부터 보기")
-            resume_btn = QPushButton("이어서 보기")
-            delete_btn = QPushButton("웹툰 삭제")
-
-            def make_start_func(p=path, tid=title_id, t=title):
-                return lambda: self.start_webtoon_from(p, t, tid, 1)
-
-            def make_resume_func(p=path, tid=title_id, t=title):
-                def resume():
-                    progress_file = os.path.join(p, "last_read.txt")
-                    episode = 1
-                    if os.path.exists(progress_file):
-                        with open(progress_file, "r") as f:
-                            try:
-                                episode = int(f.read().strip())
-                            except:
-                                episode = 1
-                    self.start_webtoon_from(p, t, tid, episode)
-                return resume
-
-            def make_delete_func(p=path, w=card):
-                def delete():
-                    confirm = QMessageBox.question(self, "삭제 확인", f"{title} 웹툰을 삭제하시겠습니까?", QMessageBox.Yes | QMessageBox.No)
-                    if confirm == QMessageBox.Yes:
-                        import shutil
-                        shutil.rmtree(p)
-                        layout.removeWidget(w)
-                        w.setParent(None)
-                return delete
-
-            start_btn.clicked.connect(make_start_func())
-            resume_btn.clicked.connect(make_resume_func())
-            delete_btn.clicked.connect(make_delete_func())
-
-            btn_layout.addWidget(start_btn)
-            btn_layout.addWidget(resume_btn)
-
-            # 회차 선택 콤보박스 추가
-            episode_select = QComboBox()
-            episode_select.addItem("회차 선택")
-
-            episode_numbers = sorted({
-                int(name.split("_")[-2])
-                for name in os.listdir(path)
-                if name.endswith(".jpg") and name.count("_") >= 2 and name.split("_")[-2].isdigit()
-            })
-
-            last_episode = None
-            progress_file = os.path.join(path, "last_read.txt")
-            if os.path.exists(progress_file):
-                try:
-                    with open(progress_file, "r") as f:
-                        last_episode = int(f.read().strip().split(":")[0])
-                except:
-                    pass
-
-            for ep in episode_numbers:
-                text = f"{ep}화"
-                if last_episode == ep:
-                    text += " ⭐"
-                episode_select.addItem(text, ep)
-
-            episode_select.currentIndexChanged.connect(
-                lambda _, p=path, t=title, tid=title_id, box=episode_select:
-                    self.start_webtoon_from(p, t, tid, box.currentData())
-                    if isinstance(box.currentData(), int) else None
-            )
-            btn_layout.addWidget(episode_select)
-            btn_layout.addWidget(delete_btn)
-
-            card_layout.addWidget(thumb_label)
-
-            # 웹툰 제목 표시 라벨 추가
-            title_label = QLabel(f"<b>{title}</b>")
-            title_label.setAlignment(Qt.AlignCenter)
-            card_layout.addWidget(title_label)
-            card_layout.addWidget(desc_label)
-            card_layout.addLayout(btn_layout)
-            card.setLayout(card_layout)
-
-            row = layout.rowCount()
-            layout.addWidget(card, row, 0, 1, 1)
-
-            full_layout.addWidget(container)
-        container.setLayout(layout)
-        scroll.setWidget(full_container)
-        self.webtoon_list_window.setCentralWidget(scroll)
+        self.library_view = LibraryView(scroll, self.make_library_card)
+        scroll.setWidget(self.library_view)
+        full_layout.addWidget(scroll)
+        self.webtoon_list_window.setCentralWidget(full_container)
         self.webtoon_list_window.show()
 
-    def filter_webtoons(self, layout, container):
-        keyword = self.search_input.text().lower()
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item is None:
-                continue
-            widget = item.widget()
-            if not widget:
-                continue
-            label_widgets = widget.findChildren(QLabel)
-            match = False
-            for lbl in label_widgets:
-                if keyword in lbl.text().lower():
-                    match = True
-                    break
-            widget.setVisible(match)
+        # 이미 열어둔 폴더면 색인을 그대로 넘기고, 아니면 스레드에서 새로 연다
+        if self.library_index is not None and self.library_index.root == folder:
+            self.library_thread = LibraryLoadThread(folder, self.metadata_cache, self.library_index, self.progress_store)
+        else:
+            self.library_thread = LibraryLoadThread(folder, self.metadata_cache)
+        view = self.library_view
+        self.library_thread.library_signal.connect(self.set_library)
+        self.library_thread.titles_signal.connect(view.add_entries)
+        self.library_thread.finished.connect(lambda v=view: self.library_loaded(v))
+        self.library_thread.start()
+
+    def library_loaded(self, view):
+        if view is not self.library_view:
+            return
+        if not view.entries:
+            self.webtoon_list_window.close()
+            QMessageBox.warning(self, "경고", "해당 경로에 저장된 웹툰이 없습니다.")
+            return
+        self.library_status_label.setText(f"저장된 웹툰 {len(view.entries)}개")
+        # 캐시에 있으면 바로 쓰고, 없거나 오래된 것은 백그라운드에서 갱신
+        stale = [(e["title_id"], e["path"]) for e in view.entries if self.metadata_cache.is_stale(e["title_id"])]
+        if stale:
+            self.metadata_thread = MetadataRefreshThread(self.metadata_cache, stale)
+            self.metadata_thread.metadata_signal.connect(self.update_card_metadata)
+            self.metadata_thread.start()
+
+    def make_library_card(self, entry):
+        title_id, title, path = entry["title_id"], entry["title"], entry["path"]
+        card = QWidget()
+        card_layout = QHBoxLayout()
+
+        card.thumb_label = QLabel()
+        card.thumb_label.setFixedSize(120, 160)
+        card.thumb_label.setAlignment(Qt.AlignCenter)
+        card.title_path = path
+        card.thumb_source = thumbnail_source(path, self.metadata_cache, title_id)
+        if card.thumb_source:
+            self.thumbnail_cache.record_lookup(card.thumb_source)
+        card.desc_label = QLabel()
+        self.set_card_metadata(card, self.metadata_cache.get(title_id))
+        card.desc_label.setWordWrap(True)
+        card.desc_label.setFixedWidth(400)
+
+        btn_layout = QVBoxLayout()
+        start_btn = QPushButton("처음부터 보기")
+        resume_btn = QPushButton("이어서 보기")
+        delete_btn = QPushButton("웹툰 삭제")
+
+        def resume():
+            progress = self.progress_store.get(title_id)
+            episode = progress["episode"] if progress else 1
+            self.start_webtoon_from(path, title, title_id, episode)
+
+        def delete():
+            confirm = QMessageBox.question(self, "삭제 확인", f"{title} 웹툰을 삭제하시겠습니까?", QMessageBox.Yes | QMessageBox.No)
+            if confirm == QMessageBox.Yes:
+                shutil.rmtree(path)
+                try:
+                    self.library_index.remove_title(title_id)
+                except sqlite3.Error as e:
+                    print("라이브러리 색인 저장 실패:", e)
+                    QMessageBox.warning(self, "Warning", f"라이브러리 색인을 고치지 못했습니다: {e}")
+                self.progress_store.remove(title_id)
+                self.save_progress_later()
+                self.library_view.remove_entry(title_id)
+
+        start_btn.clicked.connect(lambda: self.start_webtoon_from(path, title, title_id, 1))
+        resume_btn.clicked.connect(resume)
+        delete_btn.clicked.connect(delete)
+
+        btn_layout.addWidget(start_btn)
+        btn_layout.addWidget(resume_btn)
+
+        # 회차 선택 콤보박스 추가
+        episode_select = QComboBox()
+        episode_select.addItem("회차 선택")
+
+        progress = self.progress_store.get(title_id)
+        last_episode = progress["episode"] if progress else None
+
+        for ep in self.library_index.episodes(title_id):
+            text = f"{ep}화"
+            if last_episode == ep:
+                text += " ⭐"
+            episode_select.addItem(text, ep)
+
+        episode_select.currentIndexChanged.connect(
+            lambda _, box=episode_select:
+                self.start_webtoon_from(path, title, title_id, box.currentData())
+                if isinstance(box.currentData(), int) else None
+        )
+        btn_layout.addWidget(episode_select)
+        btn_layout.addWidget(delete_btn)
+
+        card_layout.addWidget(card.thumb_label)
+
+        # 웹툰 제목 표시 라벨 추가
+        title_label = QLabel(f"<b>{title}</b>")
+        title_label.setAlignment(Qt.AlignCenter)
+        card_layout.addWidget(title_label)
+        card_layout.addWidget(card.desc_label)
+        card_layout.addLayout(btn_layout)
+        card.setLayout(card_layout)
+        return card
+
+    def set_card_metadata(self, card, entry):
+        if entry is None:
+            card.desc_label.setText("설명을 불러오는 중...")
+        else:
+            card.desc_label.setText(entry.get("description") or "설명을 가져올 수 없습니다.")
+        self.set_card_thumbnail(card)
+
+    def set_card_thumbnail(self, card):
+        pixmap = self.thumbnail_cache.get(card.thumb_source) if card.thumb_source else None
+        if pixmap is None:
+            card.thumb_label.setText("썸네일 없음")
+            if card.thumb_source:
+                self.thumbnail_cache.request(card.thumb_source)
+        else:
+            card.thumb_label.setPixmap(pixmap)
+
+    def on_thumbnail_ready(self, path):
+        for card in self.library_view.cards.values():
+            if card.thumb_source == path:
+                card.thumb_label.setPixmap(self.thumbnail_cache.get(path))
+
+    def update_card_metadata(self, title_id, entry):
+        self.library_view.set_description(title_id, entry.get("description", ""))
+        # 새로 받은 썸네일이 있을 수 있으니 메모리에 있던 것은 버린다
+        self.thumbnail_cache.forget(self.metadata_cache.thumbnail_path(title_id))
+        # 화면 밖이라 아직 카드가 없으면 나중에 만들 때 캐시에서 읽는다
+        card = self.library_view.card(title_id)
+        if card is not None:
+            card.thumb_source = thumbnail_source(card.title_path, self.metadata_cache, title_id)
+            self.set_card_metadata(card, entry)
+
+    def filter_webtoons(self):
+        self.library_view.set_query(self.search_input.text())
 
     def start_webtoon_from(self, folder, title, title_id, start_episode):
+        self.readahead_queue = []
+        self.viewer_continuous = self.continuous_mode_checkbox.isChecked()
         self.viewer_folder = folder
         self.viewer_title = title
         self.viewer_title_id = title_id
@@ -425,9 +1046,10 @@ class AlertButton(QWidget):
         self.viewer_title = title
         self.viewer_title_id = title_id
         self.viewer_current_episode = start_episode
-        episode_images = glob.glob(os.path.join(folder, f"*_{start_episode}_*.jpg"))
+        index = self.open_library(os.path.dirname(folder))
+        self.load_viewer_catalog()
 
-        if not episode_images:
+        if not index.has_episode(title_id, start_episode):
             reply = QMessageBox.question(self, "에피소드 없음", f"{start_episode}화를 다운로드하시겠습니까?", QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.No:
                 return
@@ -436,14 +1058,11 @@ class AlertButton(QWidget):
             self.saved_webtoon_viewer.setWindowTitle(f"{title} - {start_episode}화")
             self.saved_webtoon_viewer.resize(1000, 800)
 
-            self.scroll_layout = QVBoxLayout()
-            self.scroll_layout.setSpacing(0)
-            scroll_widget = QWidget()
-            scroll_widget.setLayout(self.scroll_layout)
+            self.viewer_strip = EpisodeStrip(self.image_cache)
 
             self.scroll_area = QScrollArea()
             self.scroll_area.setWidgetResizable(True)
-            self.scroll_area.setWidget(scroll_widget)
+            self.scroll_area.setWidget(self.viewer_strip)
             self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
             self.saved_webtoon_viewer.setCentralWidget(self.scroll_area)
 
@@ -476,21 +1095,7 @@ class AlertButton(QWidget):
 
             self.saved_webtoon_viewer.show()
 
-            self.download_thread = DownloadThread(title_id, title, start_episode, start_episode, os.path.dirname(folder))
-            self.download_thread.progress_signal.connect(self.show_centered_message)
-            self.download_thread.finished.connect(lambda: self.after_auto_download(start_episode))
-            self.download_thread.start()
-            return
-
-            self.download_thread = DownloadThread(title_id, title, start_episode, start_episode, os.path.dirname(folder))
-            self.download_thread.progress_signal.connect(self.show_centered_message)
-            self.download_thread.finished.connect(lambda: self.after_auto_download(start_episode))
-            self.download_thread.start()
-            return
-            self.download_thread = DownloadThread(title_id, title, start_episode, start_episode, os.path.dirname(folder))
-            self.download_thread.progress_signal.connect(self.show_centered_message)
-            self.download_thread.finished.connect(lambda: self.after_auto_download(start_episode))
-            self.download_thread.start()
+            self.start_episode_download(start_episode, self.after_auto_download)
             return
     
         self.viewer_folder = folder
@@ -502,14 +1107,11 @@ class AlertButton(QWidget):
         self.saved_webtoon_viewer.setWindowTitle(f"{title} - {start_episode}화")
         self.saved_webtoon_viewer.resize(1000, 800)
     
-        self.scroll_layout = QVBoxLayout()
-        self.scroll_layout.setSpacing(0)
-        scroll_widget = QWidget()
-        scroll_widget.setLayout(self.scroll_layout)
+        self.viewer_strip = EpisodeStrip(self.image_cache)
     
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(scroll_widget)
+        self.scroll_area.setWidget(self.viewer_strip)
         self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
         self.saved_webtoon_viewer.setCentralWidget(self.scroll_area)
     
@@ -546,137 +1148,225 @@ class AlertButton(QWidget):
 
     def load_viewer_episode(self, episode):
         self.saved_webtoon_viewer.setWindowTitle(f"{self.viewer_title} - {episode}화")
-        # 기존 이미지 제거
-        while self.scroll_layout.count():
-            item = self.scroll_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.setParent(None)
-
-        image_paths = natsorted(glob.glob(os.path.join(self.viewer_folder, f"*_{episode}_*.jpg")))
-        if not image_paths:
+        image_rows = self.library_index.image_rows(self.viewer_title_id, episode)
+        if not image_rows:
             QMessageBox.information(self, "정보", f"{episode}화 이미지를 찾을 수 없습니다.")
             return
 
-        # 이미지 번호 저장 파일 불러오기
-        img_index = 0
-        progress_file = os.path.join(self.viewer_folder, "last_read.txt")
-        if os.path.exists(progress_file):
-            with open(progress_file, "r") as f:
-                try:
-                    ep, idx = f.read().strip().split(":")
-                    if int(ep) == episode:
-                        img_index = int(idx)
-                except:
-                    img_index = 0
-
-        for i, img_path in enumerate(image_paths):
-            img = QImage(img_path)
-            if img.isNull():
-                continue
-            label = QLabel()
-            pixmap = QPixmap.fromImage(img)
-            label.setPixmap(pixmap)
-            label.setScaledContents(True)
-            label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
-            label.setScaledContents(False)
-            label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-            label.setAlignment(Qt.AlignCenter)
-            self.scroll_layout.addWidget(label)
-
-            def make_update_func(ep=episode, idx=i):
-                def update_position():
-                    progress_file = os.path.join(self.viewer_folder, "last_read.txt")
-                    try:
-                        with open(progress_file, "w") as f:
-                            f.write(f"{ep}:{idx}")
-                    except:
-                        print("[경고] 위치 저장 실패")
-                return update_position
-
-            label.installEventFilter(self)
-            label.update_position = make_update_func()
-
-            if i == img_index:
-                self.scroll_target_label = label
+        # 같은 회차를 읽던 중이면 그 이미지부터
+        progress = self.progress_store.get(self.viewer_title_id)
+        img_index = progress["index"] if progress and progress["episode"] == episode else 0
+
+        # 높이만 먼저 알고, 실제 디코드는 화면 근처에 올 때 한다
+        self._adjusting_scroll = True
+        self.viewer_strip.set_episode(episode, image_rows)
+        self._adjusting_scroll = False
+        self.scroll_target = (episode, img_index)
+        self.viewer_current_index = None
+        self.prefetched_episode = None
 
         QTimer.singleShot(100, self.scroll_to_saved_image)
         self.viewer_current_episode = episode
-        try:
-            with open(progress_file, "w") as f:
-                f.write(f"{episode}:0")
-        except:
-            print("[경고] 이어보기 저장 실패")
-        # 이어보기 저장: 현재 회차, 이미지 인덱스 0으로 초기화
-        try:
-            with open(progress_file, "w") as f:
-                f.write(f"{episode}:0")
-        except:
-            print("[경고] 이어보기 저장 실패")
-        # 이어보기 저장
-        progress_file = os.path.join(self.viewer_folder, "last_read.txt")
-        try:
-            with open(progress_file, "w") as f:
-                f.write(str(episode))
-        except:
-            print("[경고] 이어보기 저장 실패")
+        self.save_viewer_position(episode, img_index)
 
     def on_scroll(self):
+        if getattr(self, '_adjusting_scroll', False):
+            return
         scroll_bar = self.scroll_area.verticalScrollBar()
         max_scroll = scroll_bar.maximum()
         current_scroll = scroll_bar.value()
+        viewport_height = self.scroll_area.viewport().height()
+        self.viewer_strip.update_viewport(current_scroll, current_scroll + viewport_height)
+        item = self.viewer_strip.item_at(current_scroll)
+        if item is not None:
+            if item["episode"] != self.viewer_current_episode:
+                # 연속 모드에서는 화면에 보이는 회차를 현재 회차로 따라간다
+                self.set_viewer_episode(item["episode"])
+            if (item["episode"], item["index"]) != getattr(self, 'viewer_current_index', None):
+                self.viewer_current_index = (item["episode"], item["index"])
+                self.save_viewer_position(item["episode"], item["index"])
+
+        episode_top, episode_height = self.viewer_strip.episode_span(self.viewer_current_episode)
+        read_ratio = (current_scroll - episode_top) / max(1, episode_height - viewport_height)
+        if max_scroll and read_ratio >= self.prefetch_ratio and getattr(self, 'prefetched_episode', None) != self.viewer_current_episode:
+            self.prefetched_episode = self.viewer_current_episode
+            for episode in (self.neighbour_episode(self.viewer_current_episode, 1), self.neighbour_episode(self.viewer_current_episode, -1)):
+                self.prefetch_episode(episode)
+        if max_scroll and read_ratio >= self.readahead_ratio and getattr(self, 'readahead_episode', None) != self.viewer_current_episode:
+            self.readahead_episode = self.viewer_current_episode
+            self.queue_readahead(self.viewer_current_episode)
+
+        if self.viewer_continuous:
+            self.extend_continuous_strip(current_scroll, max_scroll, viewport_height)
+            return
 
         if current_scroll == max_scroll:
-            next_ep = self.viewer_current_episode + 1
+            next_ep = self.neighbour_episode(self.viewer_current_episode, 1)
             if getattr(self, '_scrolling_lock', False):
                 return
             self._scrolling_lock = True
-            episode_images = glob.glob(os.path.join(self.viewer_folder, f"*_{next_ep}_*.jpg"))
-            if episode_images:
-                for i in reversed(range(self.scroll_layout.count())):
-                    widget = self.scroll_layout.itemAt(i).widget()
-                    if widget:
-                        widget.deleteLater()
+            if next_ep is None:
+                QMessageBox.information(self, "정보", "다음 회차가 없습니다.")
+                QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False))
+            elif self.library_index.has_episode(self.viewer_title_id, next_ep):
                 self.load_viewer_episode(next_ep)
                 QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False))
             else:
-                self.download_thread = DownloadThread(self.viewer_title_id, self.viewer_title, next_ep, next_ep, os.path.dirname(self.viewer_folder))
-                self.download_thread.progress_signal.connect(self.show_centered_message)
-                self.download_thread.finished.connect(lambda: self.after_auto_download(next_ep))
-                self.download_thread.error = False
-                self.download_thread.start()
+                request = self.start_episode_download(next_ep, self.after_auto_download)
                 # 🔧 다운로드 완료 후 스크롤 잠금 해제
-                self.download_thread.finished.connect(lambda: QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False)))
+                request.finished.connect(lambda: QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False)))
 
         elif current_scroll == 0:
-            prev_ep = self.viewer_current_episode - 1
-            if prev_ep < 1:
+            prev_ep = self.neighbour_episode(self.viewer_current_episode, -1)
+            if prev_ep is None:
                 QMessageBox.information(self, "정보", "이전 에피소드가 없습니다.")
                 return
-            episode_images = glob.glob(os.path.join(self.viewer_folder, f"*_{prev_ep}_*.jpg"))
-            if episode_images:
-                for i in reversed(range(self.scroll_layout.count())):
-                    widget = self.scroll_layout.itemAt(i).widget()
-                    if widget:
-                        widget.deleteLater()
+            if self.library_index.has_episode(self.viewer_title_id, prev_ep):
                 self.load_viewer_episode(prev_ep)
                 scroll_bar.setValue(scroll_bar.minimum() + 1)
             else:
-                self.download_thread = DownloadThread(self.viewer_title_id, self.viewer_title, prev_ep, prev_ep, os.path.dirname(self.viewer_folder))
-                self.download_thread.progress_signal.connect(self.show_centered_message)
-                self.download_thread.finished.connect(lambda: self.after_auto_download(prev_ep))
-                self.download_thread.start()
+                self.start_episode_download(prev_ep, self.after_auto_download)
                 QTimer.singleShot(100, lambda: scroll_bar.setValue(scroll_bar.minimum()))
 
-    def eventFilter(self, obj, event):
-        if event.type() == event.Enter and hasattr(obj, 'update_position'):
-            obj.update_position()
-        return super().eventFilter(obj, event)
+    def set_viewer_episode(self, episode):
+        self.viewer_current_episode = episode
+        self.saved_webtoon_viewer.setWindowTitle(f"{self.viewer_title} - {episode}화")
+
+    def extend_continuous_strip(self, current_scroll, max_scroll, viewport_height):
+        episodes = self.viewer_strip.episodes()
+        if not episodes:
+            return
+        # 끝에서 한 화면 안쪽으로 들어오면 다음/이전 회차를 미리 붙인다
+        if current_scroll >= max_scroll - viewport_height:
+            next_ep = self.neighbour_episode(episodes[-1], 1)
+            if next_ep is not None and self.library_index.has_episode(self.viewer_title_id, next_ep):
+                self.attach_episode(next_ep)
+            elif current_scroll == max_scroll and not getattr(self, '_scrolling_lock', False):
+                self._scrolling_lock = True
+                if next_ep is None:
+                    QMessageBox.information(self, "정보", "다음 회차가 없습니다.")
+                    QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False))
+                else:
+                    request = self.start_episode_download(next_ep, self.after_auto_download)
+                    request.finished.connect(lambda: QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False)))
+        prev_ep = self.neighbour_episode(episodes[0], -1) if current_scroll <= viewport_height else None
+        if prev_ep is not None:
+            if self.library_index.has_episode(self.viewer_title_id, prev_ep):
+                self.attach_episode(prev_ep)
+            elif current_scroll == 0 and not getattr(self, '_scrolling_lock', False):
+                self._scrolling_lock = True
+                request = self.start_episode_download(prev_ep, self.after_auto_download)
+                request.finished.connect(lambda: QTimer.singleShot(500, lambda: setattr(self, '_scrolling_lock', False)))
+
+    def attach_episode(self, episode):
+        rows = self.library_index.image_rows(self.viewer_title_id, episode)
+        if not rows or self.viewer_strip.has_episode(episode):
+            return
+        bar = self.scroll_area.verticalScrollBar()
+        position = bar.value()
+        self._adjusting_scroll = True
+        try:
+            if episode < self.viewer_strip.episodes()[0]:
+                position += self.viewer_strip.prepend_episode(episode, rows)
+            else:
+                self.viewer_strip.append_episode(episode, rows)
+            # 현재 회차에서 멀리 떨어진 회차는 잘라내서 메모리를 일정하게 유지
+            current = self.viewer_current_episode
+            keep = {self.neighbour_episode(current, -1), current, self.neighbour_episode(current, 1), episode}
+            position -= self.viewer_strip.remove_episodes_except(keep)
+            bar.setValue(position)
+        finally:
+            self._adjusting_scroll = False
+
+    def start_episode_download(self, episode, on_finished=None, show_progress=True, priority=PRIORITY_READER):
+        # 같은 회차가 이미 큐에 있으면 스케줄러가 하나로 합치고 우선순위만 올린다
+        request = self.download_scheduler.submit(os.path.dirname(self.viewer_folder), self.viewer_title_id, self.viewer_title, episode, episode, priority)
+        request.finished.connect(lambda: self.download_finished(episode, request))
+        if show_progress:
+            request.progress_signal.connect(self.show_centered_message)
+        if on_finished is not None:
+            request.finished.connect(lambda: on_finished(episode, request))
+        return request
+
+    def download_finished(self, episode, request):
+        self.readahead_requests.discard(request)
+        if request.error:
+            # 없는 회차를 만나면 그 뒤로는 미리 받지 않는다
+            self.readahead_queue = [queued for queued in self.readahead_queue if queued < episode]
+        self.pump_readahead()
+
+    def queue_readahead(self, episode):
+        next_episode = episode
+        for _ in range(self.readahead_episodes):
+            next_episode = self.neighbour_episode(next_episode, 1)
+            if next_episode is None:
+                break
+            if next_episode not in self.readahead_queue and not self.library_index.has_episode(self.viewer_title_id, next_episode):
+                self.readahead_queue.append(next_episode)
+        self.pump_readahead()
+
+    def load_viewer_catalog(self, upto=None):
+        title_id = str(self.viewer_title_id)
+        if self.viewer_catalog is None or self.viewer_catalog.title_id != title_id:
+            self.viewer_catalog = self.episode_catalog.cached(title_id)
+        if title_id in self.catalog_threads or not self.episode_catalog.is_stale(title_id, upto):
+            return
+        thread = CatalogThread(self.episode_catalog, title_id, upto)
+        thread.catalog_signal.connect(self.catalog_loaded)
+        thread.finished.connect(lambda: self.catalog_threads.pop(title_id, None))
+        self.catalog_threads[title_id] = thread
+        thread.start()
+
+    def catalog_loaded(self, title_id, episode_list):
+        if episode_list is not None and title_id == str(self.viewer_title_id):
+            self.viewer_catalog = episode_list
+
+    def neighbour_episode(self, episode, step):
+        # 받아둔 회차가 먼저, 없으면 회차 목록에서 받을 수 있는 가장 가까운 회차 (목록이 아직 없으면 바로 옆 회차)
+        candidate = episode + step
+        if candidate < 1:
+            return None
+        if self.viewer_catalog is None or self.library_index.has_episode(self.viewer_title_id, candidate):
+            return candidate
+        if step < 0:
+            return self.viewer_catalog.previous_available(episode)
+        neighbour = self.viewer_catalog.next_available(episode)
+        if neighbour is None:
+            # 목록이 조금 오래됐으면 그 사이 새 회차가 올라왔는지 뒤에서 확인해 둔다
+            self.load_viewer_catalog(upto=candidate)
+        return neighbour
+
+    def readahead_allowed(self):
+        root = os.path.dirname(self.viewer_folder)
+        if shutil.disk_usage(root).free < self.readahead_min_free_bytes:
+            return False
+        return self.library_index.title_bytes(self.viewer_title_id) < self.readahead_disk_budget
+
+    def pump_readahead(self):
+        root = os.path.dirname(self.viewer_folder)
+        while self.readahead_queue and len(self.readahead_requests) < self.readahead_max_active and self.readahead_allowed():
+            episode = self.readahead_queue.pop(0)
+            if self.download_scheduler.is_pending(root, self.viewer_title_id, episode) or self.library_index.has_episode(self.viewer_title_id, episode):
+                continue
+            self.readahead_requests.add(self.start_episode_download(episode, show_progress=False, priority=PRIORITY_READAHEAD))
+
+    def prefetch_episode(self, episode):
+        if episode is None or episode < 1:
+            return
+        rows = self.library_index.image_rows(self.viewer_title_id, episode)
+        screen_height = self.scroll_area.viewport().height() * self.prefetch_screens
+        for item in layout_items(rows, screen_height):
+            self.image_cache.request(item["path"])
+
+    def save_viewer_position(self, episode, index):
+        if self.progress_store.set(self.viewer_title_id, episode, index):
+            self.save_progress_later()
 
     def scroll_to_saved_image(self):
-        if hasattr(self, 'scroll_target_label'):
+        if hasattr(self, 'scroll_target'):
             bar = self.scroll_area.verticalScrollBar()
-            bar.setValue(self.scroll_target_label.y())
+            # 맨 위(0)에 두면 이전 회차로 넘어가므로 1px 내려둔다
+            bar.setValue(max(bar.minimum() + 1, self.viewer_strip.offset_of(*self.scroll_target)))
 
     def show_centered_message(self, message, progress):
         if hasattr(self, 'viewer_message_label'):
@@ -701,14 +1391,16 @@ class AlertButton(QWidget):
                 # ✅ 퍼센트 숫자 제거
                 self.viewer_progress_bar.setTextVisible(False)
 
-    def after_auto_download(self, episode):
-        if getattr(self.download_thread, 'error', False):
+    def after_auto_download(self, episode, request):
+        if request.error:
             self.viewer_message_label.hide()
             QMessageBox.information(self, "정보", "다음 회차가 없습니다.")
             return
-        episode_images = glob.glob(os.path.join(self.viewer_folder, f"*_{episode}_*.jpg"))
-        if episode_images:
-            self.load_viewer_episode(episode)
+        if self.library_index.has_episode(self.viewer_title_id, episode):
+            if self.viewer_continuous and self.viewer_strip.episodes():
+                self.attach_episode(episode)
+            else:
+                self.load_viewer_episode(episode)
             if hasattr(self, 'viewer_message_label'):
                 self.viewer_message_label.hide()
         else:
@@ -747,14 +1439,69 @@ class AlertButton(QWidget):
     def update_webtoon_title(self):
         webtoon_id = self.webtoon_id_input.text()
         if webtoon_id:
-            url = f"https://comic.naver.com/webtoon/detail?titleId={webtoon_id}&no=1"
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title_tag = soup.find('a', class_='title')
-            webtoon_title = title_tag.text.strip() if title_tag else ""
-            self.webtoon_title_label.setText(f"Webtoon 제목: {webtoon_title}")
-            if webtoon_title:
-                self.save_images_button.setEnabled(True)
+            self.resolve_title(webtoon_id, "1")
+
+    def cached_title(self, webtoon_id, episode_no):
+        webtoon_title = self.metadata_cache.title(webtoon_id)
+        if webtoon_title:
+            return webtoon_title
+        info = self.library_index.title_info(webtoon_id) if self.library_index is not None else None
+        if info and info[0]:
+            return info[0]
+        page = get_page_cache().get(webtoon_id, episode_no)
+        return page["title"] if page else ""
+
+    def resolve_title(self, webtoon_id, episode_no, page=None):
+        # 마지막으로 요청한 (titleId, 회차) 의 결과만 화면에 반영한다
+        webtoon_id, episode_no = str(webtoon_id), str(episode_no)
+        self.title_request = (webtoon_id, episode_no)
+        webtoon_title = self.cached_title(webtoon_id, episode_no)
+        if webtoon_title:
+            self.title_resolved(webtoon_id, episode_no, webtoon_title, "")
+        elif page is not None:
+            page.runJavaScript(TITLE_SCRIPT, lambda result: self.dom_title_found(webtoon_id, episode_no, result, page))
+        else:
+            self.fetch_title(webtoon_id, episode_no)
+
+    def dom_title_found(self, webtoon_id, episode_no, webtoon_title, page):
+        # 스크립트가 도는 사이 다른 회차로 넘어갔으면 그 페이지의 제목이므로 쓰지 않는다
+        if webtoon_title and parse_webtoon_url(page.url().toString()) == (webtoon_id, episode_no):
+            self.title_resolved(webtoon_id, episode_no, webtoon_title, "")
+        elif self.title_request == (webtoon_id, episode_no):
+            self.fetch_title(webtoon_id, episode_no)
+
+    def fetch_title(self, webtoon_id, episode_no):
+        thread = TitleLookupThread(webtoon_id, episode_no)
+        thread.title_signal.connect(self.title_resolved)
+        thread.finished.connect(lambda: self.title_threads.discard(thread))
+        self.title_threads.add(thread)
+        thread.start()
+
+    def title_resolved(self, webtoon_id, episode_no, webtoon_title, error):
+        if webtoon_title:
+            self.metadata_cache.set_title(webtoon_id, webtoon_title)
+        if self.title_request != (webtoon_id, episode_no):
+            return
+        if error:
+            self.status_bar.showMessage(f"웹툰 제목 가져오기 실패: {error}")
+            return
+        self.webtoon_title_label.setText(f"Webtoon 제목: {webtoon_title}")
+        if webtoon_title:
+            self.save_images_button.setEnabled(True)
+
+    def concurrency_bounds(self):
+        min_text = self.min_workers_input.text()
+        max_text = self.max_workers_input.text()
+        min_workers = int(min_text) if min_text else 2
+        max_workers = int(max_text) if max_text else 32
+        return {"min_workers": min_workers, "max_workers": max(min_workers, max_workers)}
+
+    def apply_rate(self):
+        rate_text = self.rate_input.text()
+        get_client().set_default_rate(int(rate_text) if rate_text else 0)
+
+    def download_options(self):
+        return dict(self.concurrency_bounds(), dedup=self.dedup_checkbox.isChecked())
 
     def set_webtoon_info(self, webtoon_id, webtoon_title, episode_no):
         self.webtoon_title_label.setText(f"Webtoon 제목: {webtoon_title}")
@@ -776,6 +1523,10 @@ class AlertButton(QWidget):
         if start_episode > end_episode:
             QMessageBox.warning(self, "Warning", "시작 에피소드는 종료 에피소드보다 숫자가 작거나 같아야 합니다.")
             return
+        episode_list = self.episode_catalog.cached(webtoon_id)
+        if episode_list is not None and not self.episode_catalog.is_stale(webtoon_id, end_episode) and not episode_list.available_in(start_episode, end_episode):
+            QMessageBox.warning(self, "Warning", "받을 수 있는 회차가 없습니다. (없는 회차이거나 유료 회차입니다)")
+            return
         self.save_images_button.setEnabled(False)
         self.webtoon_viewer.start_image_download(webtoon_id, webtoon_title, start_episode, end_episode)
         self.status_bar.showMessage("Download started...")
@@ -789,6 +1540,9 @@ class AlertButton(QWidget):
             QMessageBox.warning(self, "Warning", "다운로드된 에피소드가 없습니다.")
 
     def closeEvent(self, event):
+        if self.progress_store is not None:
+            self.progress_store.flush()
+        self.metadata_cache.save()
         self.webtoon_viewer.close()
         event.accept()
 
@@ -799,7 +1553,14 @@ def main():
     alert_button.webtoon_viewer = webtoon_viewer
     webtoon_viewer.show()
     alert_button.show()
-    sys.exit(app.exec_())
+    webtoon_viewer.resume_downloads()
+    # ATVIEWER_METRICS=파일 경로 를 주면 통계를 주기적으로 저장 (.json 이면 JSON, 아니면 Prometheus 텍스트)
+    metrics_path = os.environ.get("ATVIEWER_METRICS")
+    exporter = MetricsExporter(metrics_path, float(os.environ.get("ATVIEWER_METRICS_INTERVAL") or 10)).start() if metrics_path else None
+    status = app.exec_()
+    if exporter is not None:
+        exporter.stop()
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
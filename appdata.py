@@ -0,0 +1,18 @@
+import json
+import os
+import threading
+
+# 앱 전체가 같이 쓰는 캐시/설정 폴더 (메타데이터, 회차 목록, 페이지 캐시, 다운로드 목록 등)
+# 벤치마크처럼 실제 캐시를 건드리면 안 될 때는 ATVIEWER_HOME 으로 다른 폴더를 쓴다
+APP_DIR = os.environ.get("ATVIEWER_HOME") or os.path.join(os.path.expanduser("~"), ".atviewer")
+
+
+def atomic_write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
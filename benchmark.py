@@ -0,0 +1,385 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+from PyQt5.QtWidgets import QApplication
+
+import webtoonpage
+from downloader import Downloader
+from postprocess import PostProcessor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCENARIOS = ("download", "library", "reader")
+ARTICLES_PER_PAGE = 20
+
+
+def make_jpeg(target_bytes, width=690, quality=85):
+    # 노이즈 이미지라서 압축이 잘 안 되므로 높이로 크기를 맞춘다
+    def encode(height):
+        output = BytesIO()
+        Image.effect_noise((width, height), 48).convert("RGB").save(output, "JPEG", quality=quality)
+        return output.getvalue()
+
+    height = 100
+    for _ in range(3):
+        height = max(16, int(height * target_bytes / len(encode(height))))
+    return encode(height)
+
+
+class SyntheticSite:
+    # 스크레이퍼가 기대하는 모양의 목록/회차 페이지, 회차 목록 API, JPEG 을 내주는 로컬 서버
+    # latency 는 요청마다 기다리는 시간(초), error_rate 만큼은 503 을 돌려준다
+    def __init__(self, episodes=10, images=20, image_bytes=200 * 1024, latency=0.0, image_latency=None, error_rate=0.0, seed=0):
+        self.episodes = episodes
+        self.images = images
+        self.image = make_jpeg(image_bytes)
+        self.thumbnail = make_jpeg(8 * 1024, width=160)
+        self.latency = latency
+        self.image_latency = latency if image_latency is None else image_latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, content_type, body = site.handle(self.path)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 시나리오 프로세스가 끝나면서 끊은 연결
+                    pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "errors": 0, "bytes": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def handle(self, path):
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.count("requests")
+        is_image = url.path.endswith(".jpg")
+        delay = self.image_latency if is_image else self.latency
+        if delay:
+            time.sleep(delay)
+        with self.lock:
+            failed = self.error_rate and self.random.random() < self.error_rate
+        if failed:
+            self.count("errors")
+            return 503, "text/plain", b"injected error"
+        if url.path == "/webtoon/list":
+            status, content_type, body = 200, "text/html; charset=utf-8", self.list_page(query["titleId"]).encode("utf-8")
+        elif url.path == "/webtoon/detail":
+            status, content_type, body = self.detail_page(query["titleId"], int(query["no"]))
+        elif url.path == "/api/article/list":
+            status, content_type, body = 200, "application/json", self.article_list(int(query.get("page", 1)))
+        elif url.path.endswith("/thumbnail.jpg"):
+            status, content_type, body = 200, "image/jpeg", self.thumbnail
+        elif is_image:
+            status, content_type, body = 200, "image/jpeg", self.image
+        else:
+            status, content_type, body = 404, "text/plain", b"not found"
+        self.count("bytes", len(body))
+        return status, content_type, body
+
+    def title(self, title_id):
+        return f"벤치마크{title_id}"
+
+    def list_page(self, title_id):
+        return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8">
+<meta property="og:title" content="{self.title(title_id)}">
+<meta property="og:image" content="{self.url}/{webtoonpage.IMAGE_HOST}{title_id}/thumbnail.jpg">
+<meta property="og:description" content="{self.title(title_id)} 설명">
+</head><body></body></html>"""
+
+    def detail_page(self, title_id, episode):
+        if not 1 <= episode <= self.episodes:
+            return 200, "text/html; charset=utf-8", b"<html><body></body></html>"
+        html = webtoonpage.synthetic_detail_page(self.title(title_id), title_id, episode, self.images, image_root=f"{self.url}/")
+        return 200, "text/html; charset=utf-8", html.encode("utf-8")
+
+    def article_list(self, page):
+        total_pages = max(1, -(-self.episodes // ARTICLES_PER_PAGE))
+        # 실제 API 처럼 최신 회차부터
+        newest = self.episodes - (page - 1) * ARTICLES_PER_PAGE
+        articles = [
+            {"no": no, "subtitle": f"{no}화", "charge": False}
+            for no in range(newest, max(0, newest - ARTICLES_PER_PAGE), -1)
+        ]
+        return json.dumps({"articleList": articles, "pageInfo": {"page": page, "totalPages": total_pages}}).encode("utf-8")
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_viewer():
+    # 파일 이름에 '!' 가 있어서 import 문으로는 못 부른다
+    spec = importlib.util.spec_from_file_location("atviewer", os.path.join(os.path.dirname(os.path.abspath(__file__)), "At!viewer.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def wait_until(app, predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def download_title(title_id, save_dir, args, postprocessor=None):
+    events = []
+    downloader = Downloader(
+        str(title_id), "", 1, args.episodes, save_dir,
+        min_workers=args.min_workers, max_workers=args.max_workers, postprocessor=postprocessor, on_progress=events.append,
+    )
+    downloader.run()
+    return downloader, events
+
+
+def bench_download(args):
+    save_dir = tempfile.mkdtemp(prefix="download-", dir=args.work_dir)
+    postprocessor = PostProcessor(args.cpu_workers) if args.cpu_workers else None
+    started = time.perf_counter()
+    downloader, events = download_title(100001, save_dir, args, postprocessor)
+    elapsed = time.perf_counter() - started
+    if postprocessor is not None:
+        postprocessor.close()
+    image_bytes = sum(event.get("bytes", 0) for event in events if event["event"] == "image")
+    images = downloader.downloaded_images
+    return {
+        "seconds": round(elapsed, 3),
+        "episodes": len(downloader.downloaded_episodes),
+        "images": images,
+        "failed_images": downloader.total_images - images,
+        "images_per_s": round(images / elapsed, 1),
+        "mb_per_s": round(image_bytes / elapsed / 1024 ** 2, 2),
+        "error": downloader.error_message or None,
+    }
+
+
+def make_library(root, titles, image):
+    for i in range(titles):
+        title_id = 200000 + i
+        title = f"벤치마크{title_id}"
+        title_dir = os.path.join(root, f"{title}_{title_id}")
+        os.makedirs(title_dir)
+        with open(os.path.join(title_dir, f"{title}_{title_id}_1_1.jpg"), "wb") as f:
+            f.write(image)
+
+
+def open_library_window(viewer, app, root, titles):
+    viewer.QFileDialog.getExistingDirectory = lambda *args, **kwargs: root
+    alert_button = viewer.AlertButton(None)
+    started = time.perf_counter()
+    alert_button.view_saved_webtoon()
+    window_ms = (time.perf_counter() - started) * 1000
+    app.processEvents()
+    loaded = wait_until(app, lambda: len(alert_button.library_view.entries) >= titles, 600)
+    titles_ms = (time.perf_counter() - started) * 1000
+    alert_button.library_thread.wait()
+    result = {"window_ms": round(window_ms, 1), "all_titles_ms": round(titles_ms, 1), "loaded": loaded}
+    alert_button.webtoon_list_window.close()
+    return result
+
+
+def bench_library(args):
+    viewer = load_viewer()
+    app = QApplication.instance() or QApplication([])
+    root = tempfile.mkdtemp(prefix="library-", dir=args.work_dir)
+    make_library(root, args.library_titles, make_jpeg(4 * 1024, width=100))
+    # 처음 열 때는 폴더를 훑어 색인을 만들고, 두 번째부터는 색인만 읽는다
+    cold = open_library_window(viewer, app, root, args.library_titles)
+    warm = open_library_window(viewer, app, root, args.library_titles)
+    return {"titles": args.library_titles, "cold": cold, "warm": warm}
+
+
+def bench_reader(args):
+    viewer = load_viewer()
+    app = QApplication.instance() or QApplication([])
+    root = tempfile.mkdtemp(prefix="reader-", dir=args.work_dir)
+    downloader, _ = download_title(300001, root, args)
+    folder = os.path.join(root, f"{downloader.webtoon_title}_{downloader.webtoon_id}")
+    rss_before = peak_rss_bytes()
+
+    alert_button = viewer.AlertButton(None)
+    started = time.perf_counter()
+    alert_button.start_webtoon_from(folder, downloader.webtoon_title, downloader.webtoon_id, 1)
+    cache = alert_button.image_cache
+    strip = alert_button.viewer_strip
+    first_path = strip.items[0]["path"]
+    decoded = wait_until(app, lambda: first_path in cache.entries or first_path in cache.failed, 60)
+    open_ms = (time.perf_counter() - started) * 1000
+
+    # 한 화면씩 끝까지 내려가며 화면에 보이는 이미지가 다 디코드될 때까지의 시간을 잰다
+    bar = alert_button.scroll_area.verticalScrollBar()
+    viewport_height = alert_button.scroll_area.viewport().height()
+    steps = []
+    while True:
+        app.processEvents()
+        last_episode = strip.episodes()[-1] if strip.episodes() else 0
+        target = bar.value() + viewport_height
+        if target >= bar.maximum():
+            if last_episode >= len(downloader.downloaded_episodes):
+                break
+            # 끝까지(max) 가면 다음 회차 안내창이 뜨므로 바로 앞까지만
+            target = bar.maximum() - 1
+        if target <= bar.value():
+            break
+        step_started = time.perf_counter()
+        bar.setValue(target)
+        visible = [strip.items[i]["path"] for i in strip.indexes_between(bar.value(), bar.value() + viewport_height)]
+        wait_until(app, lambda: all(path in cache.entries or path in cache.failed for path in visible), 30)
+        steps.append((time.perf_counter() - step_started) * 1000)
+    steps.sort()
+    result = {
+        "episodes": len(downloader.downloaded_episodes),
+        "images_per_episode": args.images,
+        "open_ms": round(open_ms, 1),
+        "first_image_decoded": decoded,
+        "scroll_steps": len(steps),
+        "scroll_step_p50_ms": round(steps[len(steps) // 2], 1) if steps else None,
+        "scroll_step_max_ms": round(steps[-1], 1) if steps else None,
+        "decoded_cache_bytes": cache.used_bytes,
+        "peak_rss_before_bytes": rss_before,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    if not steps:
+        # 회차가 한 화면보다 짧으면 (--image-kb 가 작을 때) 스크롤 지연을 잴 수 없으므로 정상 결과로 남기지 않는다
+        result["failed"] = f"회차가 화면({viewport_height}px)보다 짧아서 스크롤할 수 없습니다. --images 나 --image-kb 를 늘리세요"
+    return result
+
+
+BENCHMARKS = {"download": bench_download, "library": bench_library, "reader": bench_reader}
+
+
+def git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def run_child(scenario, argv, site, home):
+    # 시나리오마다 새 프로세스: 모듈 캐시, 메모리 최대치(RSS)가 앞 시나리오에 영향을 받지 않도록
+    env = dict(os.environ, ATVIEWER_BASE_URL=site.url, ATVIEWER_HOME=home)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    site.reset_stats()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *argv, "--child", scenario],
+        capture_output=True, text=True, encoding="utf-8", env=env,
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        return {"failed": completed.stderr.strip().splitlines()[-1:] or f"exit {completed.returncode}"}
+    return dict(json.loads(lines[-1]), server=dict(site.stats))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="로컬 가짜 웹툰 서버로 다운로드/서재/뷰어 성능 측정 (결과는 JSON)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"쉼표로 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument("--images", type=int, default=20, help="회차당 이미지 수")
+    parser.add_argument("--image-kb", type=int, default=200, help="이미지 하나 크기")
+    parser.add_argument("--latency-ms", type=float, default=20, help="페이지 요청 지연")
+    parser.add_argument("--image-latency-ms", type=float, default=None, help="이미지 요청 지연 (기본값: 페이지와 같음)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 으로 실패시킬 요청 비율 (0~1)")
+    parser.add_argument("--min-workers", type=int, default=2)
+    parser.add_argument("--max-workers", type=int, default=32)
+    parser.add_argument("--cpu-workers", type=int, default=0, help="0 보다 크면 다운로드 시나리오에 프로세스 풀 후처리를 쓴다")
+    parser.add_argument("--library-titles", type=int, default=2000)
+    parser.add_argument("-o", "--output", help="결과를 한 줄짜리 JSON 으로 이어 붙일 파일")
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(BENCHMARKS[args.child](args), ensure_ascii=False), flush=True)
+        # 뒤에서 돌던 Qt 스레드(메타데이터 갱신 등)를 기다리지 않고 끝낸다
+        os._exit(0)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    image_latency = None if args.image_latency_ms is None else args.image_latency_ms / 1000
+    site = SyntheticSite(args.episodes, args.images, args.image_kb * 1024, args.latency_ms / 1000, image_latency, args.error_rate).start()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="atviewer-bench-") as work_dir:
+        for scenario in scenarios:
+            home = tempfile.mkdtemp(prefix=f"{scenario}-home-", dir=work_dir)
+            results[scenario] = run_child(scenario, [*argv, "--work-dir", work_dir], site, home)
+            print(f"{scenario}: {json.dumps(results[scenario], ensure_ascii=False)}", file=sys.stderr)
+    site.stop()
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "work_dir", "child")},
+        "results": results,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    return 0 if all("failed" not in result for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
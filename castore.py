@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+
+OBJECTS_DIR = ".objects"
+
+
+class ContentStore:
+    # 이미지 내용을 sha256 으로 한 번만 보관 (objects/ab/abcdef...), 원래 파일 이름은 하드링크로 연결
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    @classmethod
+    def for_library(cls, root):
+        return cls(os.path.join(root, OBJECTS_DIR))
+
+    def object_path(self, digest):
+        return os.path.join(self.store_dir, digest[:2], digest)
+
+    def put(self, data, path):
+        # 같은 내용이 이미 있으면 디스크에는 한 번도 쓰지 않는다
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.part"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, object_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return digest, self.link(object_path, path)
+
+    def link(self, object_path, path):
+        # 하드링크가 안 되는 파일시스템이면 색인에 객체 경로를 그대로 적도록 객체 경로를 돌려준다
+        if os.path.exists(path):
+            if os.path.samefile(object_path, path):
+                return path
+            os.remove(path)
+        try:
+            os.link(object_path, path)
+        except OSError:
+            return object_path
+        return path
+
+    def objects(self):
+        if not os.path.isdir(self.store_dir):
+            return
+        for prefix in os.scandir(self.store_dir):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if not entry.is_file() or entry.name.endswith(".part"):
+                    continue
+                # Windows 의 DirEntry.stat() 은 st_nlink 를 0 으로 주므로 하드링크 수는 os.stat 으로 읽는다
+                try:
+                    stat = os.stat(entry.path)
+                except OSError:
+                    continue
+                yield entry.name, entry.path, stat
+
+    def report(self, indexes):
+        # 색인에 적힌 이미지(논리 크기)와 실제로 객체로 들고 있는 크기를 비교
+        references = {}
+        logical_bytes = 0
+        for index in indexes:
+            for digest, count, size, path in index.digest_counts():
+                entry = references.setdefault(digest, {"count": 0, "bytes": size or 0, "example": path})
+                entry["count"] += count
+                logical_bytes += (size or 0) * count
+        object_count = 0
+        object_bytes = 0
+        for _, _, stat in self.objects():
+            object_count += 1
+            object_bytes += stat.st_size
+        duplicates = sorted(
+            ({"digest": digest, **entry} for digest, entry in references.items() if entry["count"] > 1),
+            key=lambda entry: entry["count"] * entry["bytes"],
+            reverse=True,
+        )
+        return {
+            "objects": object_count,
+            "object_bytes": object_bytes,
+            "images": sum(entry["count"] for entry in references.values()),
+            "logical_bytes": logical_bytes,
+            "saved_bytes": max(0, logical_bytes - object_bytes),
+            "top_duplicates": duplicates[:10],
+        }
+
+    def gc(self, indexes, dry_run=False):
+        # 하드링크도 없고 색인에서도 가리키지 않는 객체만 지운다
+        referenced = set()
+        for index in indexes:
+            referenced.update(digest for digest, _, _, _ in index.digest_counts())
+        removed = 0
+        removed_bytes = 0
+        for digest, path, stat in list(self.objects()):
+            if stat.st_nlink > 1 or digest in referenced:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print("객체 삭제 실패:", path, e)
+                    continue
+            removed += 1
+            removed_bytes += stat.st_size
+        return {"removed": removed, "removed_bytes": removed_bytes, "dry_run": dry_run}
@@ -0,0 +1,490 @@
+import argparse
+import concurrent.futures
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+from castore import ContentStore
+from episodecatalog import get_catalog
+from episodepack import convert_library
+from httpclient import get_client
+from libraryindex import LibraryIndex
+from manifest import EpisodeManifest
+from metrics import DISK_WRITE_SECONDS, DOWNLOAD_BYTES, DOWNLOAD_IMAGES, IMAGE_SECONDS, QUEUE_DEPTH, MetricsExporter
+from metacache import METADATA_TTL
+from postprocess import TRANSCODE_FORMATS, PostProcessor
+from thumbnails import THUMBNAIL_NAME
+from webtoonpage import fetch_episode_page, fetch_list_page
+
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+
+def write_chunks(f, chunks):
+    # 네트워크에서 기다린 시간은 빼고 디스크에 쓰는 데 걸린 시간만 더한다
+    elapsed = 0.0
+    for chunk in chunks:
+        started = time.perf_counter()
+        f.write(chunk)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def fetch_webtoon_title(client, webtoon_id, episode=1):
+    return fetch_episode_page(client, webtoon_id, episode)["title"]
+
+
+class Downloader:
+    # Qt 없이 도는 다운로드 본체. 진행 상황은 on_progress(event) 로 dict 를 넘긴다
+    def __init__(self, webtoon_id, webtoon_title, start_episode, end_episode, save_dir, min_workers=2, max_workers=32, save_mode="passthrough", store=None, postprocessor=None, on_progress=None):
+        self.webtoon_id = webtoon_id
+        self.webtoon_title = webtoon_title
+        self.start_episode = start_episode
+        self.end_episode = end_episode
+        self.save_dir = save_dir
+        # 동시 다운로드 수는 이 범위 안에서 호스트별로 자동 조절된다
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        # "passthrough": 받은 바이트를 그대로 저장, "reencode": 디코드 후 다시 인코딩
+        self.save_mode = save_mode
+        # ContentStore 를 주면 같은 내용의 이미지는 한 번만 저장하고 하드링크로 연결
+        self.store = store
+        # PostProcessor 를 주면 검사/변환은 프로세스 풀에서 하고 다운로드 스레드는 받기만 한다
+        self.postprocessor = postprocessor
+        self.on_progress = on_progress
+        self.reported_limits = {}
+        self.error = False
+        self.error_message = ""
+        self.downloaded_episodes = []
+        # 더 받을 것이 없는 회차 (이미지를 모두 받았거나, 목록에 없거나 유료라서 받을 수 없는 회차)
+        self.finished_episodes = []
+        self.total_images = 0
+        self.downloaded_images = 0
+
+    def report(self, event, message, **fields):
+        if self.on_progress is not None:
+            self.on_progress(dict(fields, event=event, title_id=self.webtoon_id, message=message))
+
+    def fail(self, message):
+        self.error = True
+        self.error_message = message
+        self.report("error", message)
+
+    def run(self):
+        client = get_client()
+        with client.concurrency(self.min_workers, self.max_workers):
+            try:
+                return self.download(client)
+            except sqlite3.Error as e:
+                # 색인 파일이 잠겨 있거나 깨졌을 때 스레드 밖으로 예외를 던지지 않고 실패로 알린다
+                print("라이브러리 색인 저장 실패:", e)
+                self.fail(f"라이브러리 색인 저장 실패: {e}")
+                return self.downloaded_episodes
+            except Exception as e:
+                # 폴더를 만들 수 없거나 예상 못 한 응답 등. GUI 에서는 QThread 밖으로 나가면 앱이 죽는다
+                print("다운로드 실패:", e)
+                self.fail(f"다운로드 실패: {e}")
+                return self.downloaded_episodes
+
+    def download(self, client):
+        episodes, fresh = self.episode_numbers(client)
+        if fresh:
+            # 방금 받은 목록에 없는 회차만 끝난 것으로 본다. 예전 목록이면 새로 올라온 회차일 수 있어 대기열에 남긴다
+            self.finished_episodes.extend(sorted(set(range(self.start_episode, self.end_episode + 1)) - set(episodes)))
+        if not episodes:
+            self.report("done", "받을 수 있는 회차가 없습니다.", episodes=[])
+            return self.downloaded_episodes
+        if not self.webtoon_title:
+            try:
+                self.webtoon_title = fetch_webtoon_title(client, self.webtoon_id, episodes[0])
+            except requests.RequestException as e:
+                print("웹툰 제목 가져오기 실패:", e)
+            if not self.webtoon_title:
+                self.fail("저장 할 수 없는 웹툰입니다.")
+                return self.downloaded_episodes
+        episode_dir = os.path.join(self.save_dir, f"{self.webtoon_title}_{self.webtoon_id}")
+        os.makedirs(episode_dir, exist_ok=True)
+        self.download_thumbnail(client, episode_dir)
+
+        # 회차 페이지와 이미지 하나하나를 모두 개별 작업으로 같은 풀에 넣는다
+        manifest = EpisodeManifest(episode_dir)
+        index = LibraryIndex(self.save_dir)
+        try:
+            index.add_title(self.webtoon_id, self.webtoon_title, os.path.basename(episode_dir))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = {}
+                remaining = {}
+                episode_counts = {}
+
+                def schedule_images(episode):
+                    missing = manifest.missing_images(episode)
+                    if not missing:
+                        # 예전에 받아둔 파일로 이미 다 채워진 회차
+                        self.finished_episodes.append(episode)
+                        return
+                    self.total_images += len(missing)
+                    remaining[episode] = len(missing)
+                    episode_counts[episode] = 0
+                    self.report("episode_start", f"{episode}화 이미지 {len(missing)}장 다운로드 시작", episode=episode, images=len(missing))
+                    for img_index, img in missing:
+                        image_future = executor.submit(self.download_image, client, img["url"], os.path.join(episode_dir, img["file"]))
+                        pending[image_future] = ("image", episode, img_index)
+
+                listed_images = 0
+                for episode in episodes:
+                    if manifest.is_complete(episode):
+                        self.finished_episodes.append(episode)
+                        continue
+                    if manifest.images(episode):
+                        # 이미지 목록을 이미 알고 있으면 페이지 요청 없이 빠진 이미지만 이어받기
+                        listed_images += len(manifest.images(episode))
+                        schedule_images(episode)
+                        continue
+                    pending[executor.submit(self.fetch_episode, client, episode)] = ("page", episode, None)
+
+                fetched_pages = len(pending)
+                while pending:
+                    QUEUE_DEPTH.set(len(pending), queue="tasks")
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        kind, episode, img_index = pending.pop(future)
+                        if kind == "page":
+                            try:
+                                webtoon_title, img_urls = future.result()
+                            except Exception as e:
+                                # 이 회차만 실패로 두고 (finished 에 넣지 않으므로 나중에 다시 받는다) 나머지는 계속
+                                print("회차 페이지 처리 실패:", episode, e)
+                                continue
+                            if not img_urls:
+                                continue
+                            listed_images += len(img_urls)
+                            extension = self.postprocessor.extension if self.postprocessor else ".jpg"
+                            images = [{"url": img_url, "file": f"{webtoon_title}_{self.webtoon_id}_{episode}_{i + 1}{extension}"} for i, img_url in enumerate(img_urls)]
+                            manifest.set_episode(episode, webtoon_title, images)
+                            manifest.save()
+                            schedule_images(episode)
+                            continue
+
+                        self.report_concurrency(client)
+                        try:
+                            saved = future.result()
+                        except Exception as e:
+                            # 디코드/변환 실패, 메모리 부족 등으로 죽은 프로세스 풀(BrokenProcessPool), 압축 폭탄 같은 이미지는
+                            # 이 이미지 하나만 실패로 세고 남은 .part 파일을 지운다
+                            print("이미지 처리 실패:", e)
+                            part_path = os.path.join(episode_dir, manifest.images(episode)[img_index]["file"]) + ".part"
+                            if os.path.exists(part_path):
+                                os.remove(part_path)
+                            saved = None
+                        if isinstance(saved, concurrent.futures.Future):
+                            pending[saved] = ("process", episode, img_index)
+                            continue
+                        if saved is not None:
+                            size, width, height, stored_path, digest = saved
+                            manifest.mark_done(episode, img_index, size)
+                            index.add_image(self.webtoon_id, episode, img_index + 1, stored_path, width, height, size, digest)
+                            # 같은 저장 폴더에 다른 Downloader 나 GUI 가 쓸 수 있으므로 쓰기 트랜잭션은 이미지 하나씩 짧게
+                            index.commit()
+                            episode_counts[episode] += 1
+                            self.downloaded_images += 1
+                            DOWNLOAD_IMAGES.inc()
+                            DOWNLOAD_BYTES.inc(size or 0)
+                            progress_ratio = self.downloaded_images / self.total_images * 100
+                            self.report(
+                                "image", f"Progress: {self.downloaded_images}/{self.total_images}  ({progress_ratio:.1f}%)",
+                                episode=episode, done=self.downloaded_images, total=self.total_images, percent=int(progress_ratio), bytes=size,
+                            )
+                        remaining[episode] -= 1
+                        if remaining[episode] == 0:
+                            manifest.save()
+                            self.report("episode_done", f"{episode}화 다운로드 완료: {episode_counts[episode]}장", episode=episode, images=episode_counts[episode])
+                            if episode_counts[episode] > 0:
+                                self.downloaded_episodes.append(episode)
+                            if manifest.is_complete(episode):
+                                self.finished_episodes.append(episode)
+                QUEUE_DEPTH.set(0, queue="tasks")
+            manifest.save()
+            index.commit()
+        finally:
+            index.close()
+
+        if fetched_pages and listed_images == 0:
+            self.fail("저장 할 수 없는 웹툰입니다.")
+            return self.downloaded_episodes
+        self.downloaded_episodes.sort()
+        self.report("done", "다운로드 완료.", episodes=self.downloaded_episodes)
+        return self.downloaded_episodes
+
+    def episode_numbers(self, client):
+        # 회차 목록이 있으면 실제로 받을 수 있는 회차만, 없으면 범위 전체를 하나씩 확인
+        # 목록을 새로 받지 못해 예전 목록을 쓴 경우 두 번째 값이 False
+        catalog = get_catalog()
+        episode_list = catalog.get(client, self.webtoon_id, upto=self.end_episode)
+        if episode_list is None:
+            return range(self.start_episode, self.end_episode + 1), True
+        gaps = episode_list.gaps(self.start_episode, self.end_episode)
+        locked = episode_list.locked(self.start_episode, self.end_episode)
+        beyond = self.end_episode > episode_list.last
+        if gaps or locked or beyond:
+            parts = []
+            if gaps:
+                parts.append(f"없는 회차 {len(gaps)}개")
+            if locked:
+                parts.append(f"유료 회차 {len(locked)}개")
+            if beyond:
+                parts.append(f"마지막 회차 {episode_list.last}화")
+            self.report(
+                "catalog", "건너뜀: " + ", ".join(parts),
+                gaps=gaps, locked=locked, last=episode_list.last,
+            )
+        return episode_list.available_in(self.start_episode, self.end_episode), not catalog.is_stale(self.webtoon_id, self.end_episode)
+
+    def download_thumbnail(self, client, episode_dir):
+        thumb_path = os.path.join(episode_dir, THUMBNAIL_NAME)
+        # 회차를 나눠 여러 번 받을 때마다 썸네일을 다시 받지 않도록
+        if os.path.exists(thumb_path) and time.time() - os.path.getmtime(thumb_path) < METADATA_TTL:
+            return
+        try:
+            image_url = fetch_list_page(client, self.webtoon_id)["og_image"]
+            if image_url:
+                thumb_data = client.get(image_url).content
+                with open(thumb_path + ".part", "wb") as f:
+                    f.write(thumb_data)
+                os.replace(thumb_path + ".part", thumb_path)
+        except Exception as e:
+            print("썸네일 다운로드 실패:", e)
+
+    def report_concurrency(self, client):
+        for host, limiter in list(client.limiters.items()):
+            if self.reported_limits.get(host) != limiter.limit:
+                self.reported_limits[host] = limiter.limit
+                self.report("concurrency", f"동시 다운로드 수: {host} {limiter.limit}개", host=host, limit=limiter.limit)
+
+    def fetch_episode(self, client, episode):
+        try:
+            page = fetch_episode_page(client, self.webtoon_id, episode)
+        except requests.RequestException as e:
+            print("회차 페이지 요청 실패:", e)
+            return None, []
+        if not page["title"]:
+            return None, []
+        return page["title"], page["images"]
+
+    def download_image(self, client, img_url, path):
+        part_path = path + ".part"
+        handed_off = False
+        started = time.perf_counter()
+        try:
+            with client.limiter(img_url).slot():
+                response = client.get(img_url, stream=self.postprocessor is not None or (self.save_mode == "passthrough" and self.store is None))
+                response.raise_for_status()
+                if self.postprocessor is not None:
+                    with open(part_path, "wb") as f:
+                        DISK_WRITE_SECONDS.observe(write_chunks(f, response.iter_content(64 * 1024)))
+                elif self.store is not None:
+                    data, width, height = self.encode(response.content)
+                    write_started = time.perf_counter()
+                    digest, stored_path = self.store.put(data, path)
+                    DISK_WRITE_SECONDS.observe(time.perf_counter() - write_started)
+                    return len(data), width, height, stored_path, digest
+                elif self.save_mode == "passthrough":
+                    width, height = self.save_passthrough(response, part_path)
+                else:
+                    image = Image.open(BytesIO(response.content))
+                    write_started = time.perf_counter()
+                    image.save(part_path, "JPEG")
+                    DISK_WRITE_SECONDS.observe(time.perf_counter() - write_started)
+                    width, height = image.size
+            if self.postprocessor is not None:
+                # 받은 파일은 CPU 단계로 넘기고 이 스레드는 바로 다음 이미지를 받으러 간다
+                future = self.postprocessor.submit(part_path, path, self.store)
+                handed_off = True
+                return future
+            # 다 받은 파일만 최종 이름으로 옮긴다
+            os.replace(part_path, path)
+            return os.path.getsize(path), width, height, path, None
+        except UnidentifiedImageError:
+            return None
+        except (requests.RequestException, OSError) as e:
+            print("이미지 다운로드 실패:", img_url, e)
+            return None
+        finally:
+            IMAGE_SECONDS.observe(time.perf_counter() - started)
+            if not handed_off and os.path.exists(part_path):
+                os.remove(part_path)
+
+    def encode(self, data):
+        # 객체 저장소에 넣을 바이트는 해시를 먼저 구해야 하므로 메모리에서 만든다
+        if self.save_mode == "passthrough" and data.startswith(JPEG_SIGNATURE):
+            with Image.open(BytesIO(data)) as image:
+                width, height = image.size
+            return data, width, height
+        image = Image.open(BytesIO(data))
+        output = BytesIO()
+        image.convert("RGB").save(output, "JPEG")
+        return output.getvalue(), image.width, image.height
+
+    def save_passthrough(self, response, path):
+        chunks = response.iter_content(64 * 1024)
+        head = next(chunks, b"")
+        if not head.startswith(JPEG_SIGNATURE):
+            # JPEG가 아닌 경우에만 디코드해서 변환
+            image = Image.open(BytesIO(head + b"".join(chunks)))
+            image.convert("RGB").save(path, "JPEG")
+            return image.size
+        with open(path, "wb") as f:
+            DISK_WRITE_SECONDS.observe(write_chunks(f, itertools.chain([head], chunks)))
+        # 헤더만 읽어서 크기 확인 (load 하지 않음)
+        with Image.open(path) as image:
+            width, height = image.size
+        if not width or not height:
+            raise UnidentifiedImageError(path)
+        return width, height
+
+
+def parse_spec(text):
+    # "titleId:회차" 또는 "titleId:시작-끝", 쉼표로 여러 범위
+    title_id, _, episodes = text.strip().partition(":")
+    if not title_id.isdigit() or not episodes:
+        raise ValueError(f"잘못된 형식입니다: {text!r} (예: 783053:1-10)")
+    jobs = []
+    for part in episodes.split(","):
+        start, _, end = part.partition("-")
+        start = int(start)
+        end = int(end) if end else start
+        if start < 1 or end < start:
+            raise ValueError(f"잘못된 회차 범위입니다: {text!r}")
+        jobs.append((title_id, start, end))
+    return jobs
+
+
+def read_spec_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def print_event(event, file=None):
+    # 한 줄에 JSON 하나 (cron 로그나 다른 프로그램에서 읽기 쉽도록)
+    print(json.dumps(event, ensure_ascii=False), file=file, flush=True)
+
+
+def open_store(root, store_dir):
+    return ContentStore(store_dir) if store_dir else ContentStore.for_library(root)
+
+
+def store_command(argv):
+    command = argv[0]
+    parser = argparse.ArgumentParser(prog=f"downloader.py {command}")
+    parser.add_argument("roots", nargs="+", help="저장 폴더 (객체 저장소를 같이 쓰는 폴더는 모두)")
+    parser.add_argument("--store", help="객체 저장소 폴더 (기본값: 첫 저장 폴더의 .objects)")
+    if command == "gc":
+        parser.add_argument("--dry-run", action="store_true", help="지우지 않고 지울 양만 계산")
+    args = parser.parse_args(argv[1:])
+    store = open_store(args.roots[0], args.store)
+    indexes = [LibraryIndex(root) for root in args.roots]
+    try:
+        if command == "gc":
+            result = store.gc(indexes, dry_run=args.dry_run)
+        else:
+            result = store.report(indexes)
+    finally:
+        for index in indexes:
+            index.close()
+    print_event(dict(result, event=command))
+    return 0
+
+
+def pack_command(argv):
+    command = argv[0]
+    parser = argparse.ArgumentParser(prog=f"downloader.py {command}")
+    parser.add_argument("root", help="저장 폴더")
+    parser.add_argument("--title-id", action="append", default=[], help="이 웹툰만 변환 (여러 번 지정 가능)")
+    parser.add_argument("--keep", action="store_true", help="변환한 뒤에도 원래 파일을 지우지 않음")
+    args = parser.parse_args(argv[1:])
+    index = LibraryIndex(args.root)
+    try:
+        converted = convert_library(index, set(args.title_id), unpack=command == "unpack", remove=not args.keep)
+    finally:
+        index.close()
+    print_event({"event": command, "episodes": len(converted)})
+    return 0
+
+
+COMMANDS = {"dedup-report": store_command, "gc": store_command, "pack": pack_command, "unpack": pack_command}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv)
+    parser = argparse.ArgumentParser(
+        description="앗!뷰어 웹툰 일괄 다운로드 (GUI 없이)",
+        epilog="저장 폴더 관리: dedup-report, gc [--dry-run], pack, unpack (예: downloader.py pack 저장폴더)",
+    )
+    parser.add_argument("specs", nargs="*", help="titleId:시작-끝 (예: 783053:1-10, 783053:5, 783053:1-3,7)")
+    parser.add_argument("-f", "--file", action="append", default=[], help="한 줄에 하나씩 spec 이 적힌 파일 (# 은 주석)")
+    parser.add_argument("-o", "--output", default=".", help="저장 폴더 (기본값: 현재 폴더)")
+    parser.add_argument("--min-workers", type=int, default=2)
+    parser.add_argument("--max-workers", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=0, help="호스트별 초당 최대 요청 수 (기본값: 0, 제한 없음)")
+    parser.add_argument("--burst", type=int, help="--rate 때 한꺼번에 보낼 수 있는 요청 수 (기본값: rate 의 2배)")
+    parser.add_argument("--save-mode", choices=("passthrough", "reencode"), default="passthrough")
+    parser.add_argument("--dedup", action="store_true", help="같은 내용의 이미지는 한 번만 저장하고 하드링크로 연결")
+    parser.add_argument("--store", help="--dedup 때 쓸 객체 저장소 폴더 (기본값: 저장 폴더의 .objects)")
+    parser.add_argument("--cpu-workers", type=int, default=0, help="이미지 검사/변환을 맡을 프로세스 수 (0: 다운로드 스레드에서 처리)")
+    parser.add_argument("--transcode", choices=sorted(TRANSCODE_FORMATS), help="이 형식으로 변환해서 저장 (프로세스 풀 사용)")
+    parser.add_argument("--quality", type=int, default=80, help="--transcode 품질 (기본값: 80)")
+    parser.add_argument("--metrics", help="통계를 이 파일에 주기적으로 저장 (.json 이면 JSON, 아니면 Prometheus 텍스트)")
+    parser.add_argument("--metrics-interval", type=float, default=10, help="--metrics 저장 간격(초, 기본값: 10)")
+    args = parser.parse_args(argv)
+
+    specs = list(args.specs)
+    try:
+        for path in args.file:
+            specs.extend(read_spec_file(path))
+        jobs = [job for spec in specs for job in parse_spec(spec)]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not jobs:
+        parser.error("받을 웹툰이 없습니다")
+
+    os.makedirs(args.output, exist_ok=True)
+    get_client().set_default_rate(args.rate, args.burst)
+    store = open_store(args.output, args.store) if args.dedup or args.store else None
+    postprocessor = None
+    if args.cpu_workers > 0 or args.transcode:
+        postprocessor = PostProcessor(args.cpu_workers or None, args.transcode, args.quality)
+    exporter = MetricsExporter(args.metrics, args.metrics_interval).start() if args.metrics else None
+    events = sys.stdout
+    failed = False
+    # stdout 에는 JSON 만 나가도록 나머지 출력은 stderr 로 돌린다
+    with contextlib.redirect_stdout(sys.stderr):
+        for title_id, start, end in jobs:
+            downloader = Downloader(
+                title_id, None, start, end, args.output,
+                min_workers=args.min_workers, max_workers=args.max_workers,
+                save_mode=args.save_mode, store=store, postprocessor=postprocessor,
+                on_progress=lambda event: print_event(event, events),
+            )
+            downloader.run()
+            failed = failed or downloader.error
+    if postprocessor is not None:
+        postprocessor.close()
+    if exporter is not None:
+        exporter.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # PyInstaller 로 묶었을 때 프로세스 풀 자식 프로세스가 다시 main 을 돌지 않도록
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import bisect
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from appdata import APP_DIR, atomic_write_json
+from webtoonpage import article_list_url
+
+CATALOGS_NAME = "catalogs"
+CATALOG_VERSION = 1
+CATALOG_TTL = 60 * 60
+# 목록보다 뒤 회차를 찾을 때, 목록이 이보다 오래됐으면 새 회차가 올라왔는지 다시 확인
+CATALOG_RECHECK = 10 * 60
+
+
+class EpisodeList:
+    # 한 웹툰의 회차 목록. 번호가 빠진 회차(gap)와 유료/잠긴 회차는 받을 수 없는 회차로 본다
+    def __init__(self, title_id, episodes, fetched_at):
+        self.title_id = str(title_id)
+        self.episodes = {int(no): entry for no, entry in episodes.items()}
+        self.fetched_at = fetched_at
+        self.numbers = sorted(self.episodes)
+        self.open_numbers = [no for no in self.numbers if not self.episodes[no]["locked"]]
+        self.last = self.numbers[-1] if self.numbers else 0
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def title(self, episode):
+        entry = self.episodes.get(int(episode))
+        return entry["title"] if entry else ""
+
+    def available(self, episode):
+        entry = self.episodes.get(int(episode))
+        return bool(entry and not entry["locked"])
+
+    def available_in(self, start, end):
+        return [no for no in self.open_numbers[bisect.bisect_left(self.open_numbers, start):] if no <= end]
+
+    def gaps(self, start, end):
+        return [no for no in range(max(1, start), min(end, self.last) + 1) if no not in self.episodes]
+
+    def locked(self, start, end):
+        return [no for no in self.numbers if start <= no <= end and self.episodes[no]["locked"]]
+
+    def next_available(self, episode):
+        i = bisect.bisect_right(self.open_numbers, episode)
+        return self.open_numbers[i] if i < len(self.open_numbers) else None
+
+    def previous_available(self, episode):
+        i = bisect.bisect_left(self.open_numbers, episode)
+        return self.open_numbers[i - 1] if i > 0 else None
+
+
+def article_entries(data, key):
+    # API 모양이 바뀌어 목록이 아닌 값이 오면 AttributeError 대신 실패로 처리되게
+    articles = data.get(key) or []
+    if not isinstance(articles, list) or not all(isinstance(article, dict) for article in articles):
+        raise ValueError(f"{key} 형식이 이상합니다")
+    return articles
+
+
+class EpisodeCatalog:
+    # titleId 별 회차 목록을 목록 API 에서 한 번에 받아 TTL 동안 디스크에 보관
+    def __init__(self, cache_dir=os.path.join(APP_DIR, CATALOGS_NAME), ttl=CATALOG_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.lists = {}
+
+    def path(self, title_id):
+        return os.path.join(self.cache_dir, f"{title_id}.json")
+
+    def cached(self, title_id):
+        # 오래된 목록이라도 있으면 돌려준다 (새로 받을지는 is_stale 로 판단)
+        with self.lock:
+            episode_list = self.lists.get(str(title_id))
+        if episode_list is not None:
+            return episode_list
+        try:
+            with open(self.path(title_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CATALOG_VERSION:
+            return None
+        episodes = {no: {"title": title, "locked": locked} for no, title, locked in data["episodes"]}
+        episode_list = EpisodeList(title_id, episodes, data["fetched_at"])
+        with self.lock:
+            self.lists[str(title_id)] = episode_list
+        return episode_list
+
+    def is_stale(self, title_id, upto=None):
+        episode_list = self.cached(title_id)
+        if episode_list is None:
+            return True
+        age = time.time() - episode_list.fetched_at
+        if upto is not None and upto > episode_list.last:
+            return age > CATALOG_RECHECK
+        return age > self.ttl
+
+    def get(self, client, title_id, upto=None):
+        # 목록을 받을 수 없으면 예전 목록을, 그것도 없으면 None (호출한 쪽은 한 회차씩 확인하던 방식으로)
+        if not self.is_stale(title_id, upto):
+            return self.cached(title_id)
+        try:
+            return self.fetch(client, title_id)
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            print("회차 목록 가져오기 실패:", title_id, e)
+            return self.cached(title_id)
+
+    def fetch(self, client, title_id):
+        first = self.fetch_page(client, title_id, 1)
+        pages = [first]
+        page_info = first.get("pageInfo") or {}
+        total_pages = page_info.get("totalPages", 1) if isinstance(page_info, dict) else 1
+        if not isinstance(total_pages, int):
+            raise ValueError(f"totalPages 값이 이상합니다: {total_pages!r}")
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                pages.extend(executor.map(lambda page: self.fetch_page(client, title_id, page), range(2, total_pages + 1)))
+        episodes = {}
+        for data in pages:
+            for article in article_entries(data, "articleList"):
+                episodes[int(article["no"])] = {"title": article.get("subtitle", ""), "locked": bool(article.get("charge"))}
+            # 미리보기(유료) 회차는 따로 묶여서 온다
+            for article in article_entries(data, "chargeFolderArticleList"):
+                episodes.setdefault(int(article["no"]), {"title": article.get("subtitle", ""), "locked": True})
+        if not episodes:
+            # 빈 목록으로 모든 회차를 막아버리지 않도록 실패로 본다
+            raise ValueError("빈 회차 목록")
+        episode_list = EpisodeList(title_id, episodes, time.time())
+        with self.lock:
+            self.lists[str(title_id)] = episode_list
+        self.save(episode_list)
+        return episode_list
+
+    def fetch_page(self, client, title_id, page):
+        response = client.get(article_list_url(title_id, page))
+        response.raise_for_status()
+        data = response.json()
+        if not isinstance(data, dict):
+            raise ValueError("회차 목록 응답이 객체가 아닙니다")
+        return data
+
+    def save(self, episode_list):
+        data = {
+            "version": CATALOG_VERSION,
+            "fetched_at": episode_list.fetched_at,
+            "episodes": [[no, entry["title"], entry["locked"]] for no, entry in sorted(episode_list.episodes.items())],
+        }
+        path = self.path(episode_list.title_id)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write_json(path, data)
+        except OSError as e:
+            print("회차 목록 저장 실패:", e)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = EpisodeCatalog()
+        return _catalog
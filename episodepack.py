@@ -0,0 +1,207 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+PACK_SUFFIX = ".atpack"
+PACK_PATTERN = re.compile(r"^(?P<title>.+)_(?P<title_id>\d+)_(?P<episode>\d+)\.atpack$")
+MEMBER_PATTERN = re.compile(r"^(?P<pack>.+\.atpack)#(?P<index>\d+)$")
+
+# 헤더: 매직, 버전, 이미지 수 / 이미지마다: 파일 안 위치, 길이, 너비, 높이, 원래 파일 이름 길이
+# / 원래 파일 이름들 (UTF-8) / 그 뒤로 이미지 바이트. 버전 1 pack 에는 파일 이름이 없다
+MAGIC = b"ATPK"
+PACK_VERSION = 2
+HEADER = struct.Struct("<4sHI")
+ENTRY_V1 = struct.Struct("<QIII")
+ENTRY = struct.Struct("<QIIIH")
+
+
+def pack_name(title, title_id, episode):
+    return f"{title}_{title_id}_{episode}{PACK_SUFFIX}"
+
+
+def member_path(pack_path, index):
+    return f"{pack_path}#{index}"
+
+
+def split_member(path):
+    # "…/제목_123_4.atpack#7" 이면 (pack 경로, 7), 일반 이미지 파일이면 None
+    match = MEMBER_PATTERN.match(path)
+    if match is None:
+        return None
+    return match["pack"], int(match["index"])
+
+
+def write_pack(path, images):
+    # images: [(이미지 파일 경로, 너비, 높이, 풀 때 쓸 파일 이름)]
+    sizes = [os.path.getsize(image_path) for image_path, _, _, _ in images]
+    names = [name.encode("utf-8") for _, _, _, name in images]
+    offset = HEADER.size + ENTRY.size * len(images) + sum(len(name) for name in names)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, PACK_VERSION, len(images)))
+            for (_, width, height, _), size, name in zip(images, sizes, names):
+                f.write(ENTRY.pack(offset, size, width or 0, height or 0, len(name)))
+                offset += size
+            for name in names:
+                f.write(name)
+            for image_path, _, _, _ in images:
+                with open(image_path, "rb") as src:
+                    f.write(src.read())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class EpisodePack:
+    # mmap 으로 열어두고 이미지는 memoryview 조각으로만 넘긴다 (복사 없음)
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version not in (1, PACK_VERSION):
+            raise ValueError(f"episode pack 형식이 아닙니다: {path}")
+        if version == 1:
+            self.entries = [ENTRY_V1.unpack_from(self.map, HEADER.size + i * ENTRY_V1.size) for i in range(count)]
+            self.names = [None] * count
+            return
+        entries = [ENTRY.unpack_from(self.map, HEADER.size + i * ENTRY.size) for i in range(count)]
+        self.entries = [entry[:4] for entry in entries]
+        self.names = []
+        position = HEADER.size + ENTRY.size * count
+        for entry in entries:
+            self.names.append(self.map[position:position + entry[4]].decode("utf-8"))
+            position += entry[4]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Windows 에서는 mmap 이 열려 있으면 파일을 지울 수 없으므로 지우기 전에 닫는다
+        try:
+            self.map.close()
+        except BufferError:
+            # 아직 쓰는 조각(memoryview)이 남아 있으면 그 조각이 사라질 때 GC 가 닫는다
+            pass
+
+    def size(self, index):
+        _, _, width, height = self.entries[index]
+        return width, height
+
+    def view(self, index):
+        offset, length, _, _ = self.entries[index]
+        return memoryview(self.map)[offset:offset + length]
+
+
+_packs = OrderedDict()
+_packs_lock = threading.Lock()
+
+
+def open_pack(path, max_open=16):
+    # 최근에 연 pack 몇 개만 열어둔다. 밀려난 pack 은 쓰던 조각이 다 사라지면 GC 가 닫는다
+    with _packs_lock:
+        pack = _packs.get(path)
+        if pack is not None:
+            _packs.move_to_end(path)
+            return pack
+    pack = EpisodePack(path)
+    with _packs_lock:
+        _packs[path] = pack
+        while len(_packs) > max_open:
+            _packs.popitem(last=False)
+    return pack
+
+
+def forget_pack(path):
+    with _packs_lock:
+        pack = _packs.pop(path, None)
+    if pack is not None:
+        pack.close()
+
+
+def pack_episode(index, title_id, episode, remove=True):
+    rows = index.image_rows(title_id, episode)
+    if not rows or any(split_member(path) for path, _, _, _ in rows):
+        return None
+    title, dirname = index.title_info(title_id)
+    title_dir = os.path.join(index.root, dirname)
+    # pack 이름은 이미지 파일 이름 앞부분을 그대로 쓴다 (확장자는 .jpg 든 --transcode 의 .webp 든)
+    stem, _, first = os.path.basename(rows[0][0]).rpartition("_")
+    name = stem + PACK_SUFFIX if stem and os.path.splitext(first)[0] == "1" else pack_name(title, title_id, episode)
+    pack_path = os.path.join(title_dir, name)
+    sized_rows = []
+    for path, width, height, size in rows:
+        if not width or not height:
+            # 크기는 pack 헤더에 들어가야 하므로 색인에 없으면 헤더만 읽어서 채운다
+            with Image.open(path) as image:
+                width, height = image.size
+        sized_rows.append((path, width, height, size))
+    rows = sized_rows
+    # 풀었을 때 원래 파일 이름(확장자 포함)이 돌아오도록 pack 에 적어둔다
+    # 객체 저장소에 있는 원본은 해시 이름이므로 웹툰 폴더 규칙대로 이름을 만든다
+    names = []
+    for i, (path, _, _, _) in enumerate(rows):
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(title_dir):
+            names.append(os.path.basename(path))
+        else:
+            names.append(f"{name[:-len(PACK_SUFFIX)]}_{i + 1}{os.path.splitext(path)[1] or '.jpg'}")
+    write_pack(pack_path, [(path, width, height, names[i]) for i, (path, width, height, _) in enumerate(rows)])
+    for i, (path, width, height, size) in enumerate(rows):
+        index.add_image(title_id, episode, i + 1, member_path(pack_path, i), width, height, size)
+    index.commit()
+    if remove:
+        for path, _, _, _ in rows:
+            # 객체 저장소처럼 웹툰 폴더 밖에 있는 원본은 건드리지 않는다
+            if os.path.dirname(os.path.abspath(path)) == os.path.abspath(title_dir):
+                os.remove(path)
+    return pack_path
+
+
+def unpack_episode(index, title_id, episode, remove=True):
+    rows = index.image_rows(title_id, episode)
+    members = [split_member(path) for path, _, _, _ in rows]
+    if not rows or not all(members):
+        return None
+    pack_path = members[0][0]
+    base = pack_path[:-len(PACK_SUFFIX)]
+    with EpisodePack(pack_path) as pack:
+        for i, ((_, member), (_, width, height, size)) in enumerate(zip(members, rows)):
+            # 버전 1 pack 에는 원래 이름이 없으므로 예전처럼 .jpg 로
+            name = pack.names[member]
+            path = os.path.join(os.path.dirname(pack_path), name) if name else f"{base}_{i + 1}.jpg"
+            with open(path + ".part", "wb") as f, pack.view(member) as view:
+                f.write(view)
+            os.replace(path + ".part", path)
+            index.add_image(title_id, episode, i + 1, path, width, height, size)
+    index.commit()
+    # 뷰어가 열어둔 같은 pack 도 닫아야 지울 수 있다
+    forget_pack(pack_path)
+    if remove:
+        os.remove(pack_path)
+    return pack_path
+
+
+def convert_library(index, title_ids=None, unpack=False, remove=True):
+    convert = unpack_episode if unpack else pack_episode
+    converted = []
+    for title_id, _, _ in index.titles():
+        if title_ids and title_id not in title_ids:
+            continue
+        for episode in index.episodes(title_id):
+            path = convert(index, title_id, episode, remove)
+            if path is not None:
+                converted.append(path)
+    return converted
@@ -0,0 +1,286 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import HTTP_ACTIVE, HTTP_LIMIT, REQUEST_ERRORS, REQUEST_SECONDS, RETRIES
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+
+def request_kind(url):
+    path = urlsplit(url).path
+    if path.startswith("/api/"):
+        return "api"
+    return "image" if path.lower().endswith(IMAGE_EXTENSIONS) else "page"
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    # 호스트별 동시 요청 수를 AIMD 방식으로 조절 (성공하면 +1, 오류나 지연 급증이면 절반)
+    def __init__(self, min_limit=2, max_limit=32, spike_ratio=2.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max_limit, max(min_limit, 4))
+        self.spike_ratio = spike_ratio
+        self.active = 0
+        self.successes = 0
+        self.completed = 0
+        self.errors = 0
+        self.latency = None
+        self.base_latency = None
+        self.last_decrease = 0
+        self.started = time.monotonic()
+        self.cond = threading.Condition()
+
+    def set_bounds(self, min_limit, max_limit):
+        with self.cond:
+            self.min_limit = max(1, min_limit)
+            self.max_limit = max(self.min_limit, max_limit)
+            self.limit = min(self.max_limit, max(self.min_limit, self.limit))
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        with self.cond:
+            while self.active >= int(self.limit):
+                self.cond.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def release(self):
+        # 404, 디스크 오류, 깨진 이미지 같은 예외는 혼잡이 아니므로 여기서는 줄이지 않는다
+        # (타임아웃, 연결 오류, 429/5xx 는 HttpClient.get 이 record_error 로 알린다)
+        with self.cond:
+            self.active -= 1
+            self.completed += 1
+            self.cond.notify_all()
+
+    def observe(self, elapsed):
+        # 지연은 HttpClient.get 이 요청 하나 보내고 응답 받은 시간만 넘긴다 (토큰 버킷 대기, 디스크 저장은 빼고)
+        with self.cond:
+            self.record_latency(elapsed)
+            self.cond.notify_all()
+
+    def record_latency(self, elapsed):
+        self.latency = elapsed if self.latency is None else self.latency * 0.8 + elapsed * 0.2
+        if self.base_latency is None or self.latency < self.base_latency:
+            self.base_latency = self.latency
+        else:
+            # 기준 지연은 천천히 따라 올라가게 해서 한 번의 빠른 응답에 묶이지 않도록 한다
+            self.base_latency = self.base_latency * 0.99 + self.latency * 0.01
+        if self.latency > self.base_latency * self.spike_ratio:
+            self.decrease()
+            return
+        self.successes += 1
+        if self.successes >= self.limit:
+            self.successes = 0
+            self.limit = min(self.max_limit, self.limit + 1)
+
+    def decrease(self):
+        now = time.monotonic()
+        # 한 번의 왕복 시간 안에 몰린 오류는 한 번만 반영
+        if now - self.last_decrease < (self.latency or 1):
+            return
+        self.last_decrease = now
+        self.successes = 0
+        self.limit = max(self.min_limit, self.limit // 2)
+
+    def record_error(self):
+        with self.cond:
+            self.errors += 1
+            self.decrease()
+
+    def stats(self):
+        with self.cond:
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            return {
+                "limit": self.limit,
+                "active": self.active,
+                "throughput": self.completed / elapsed,
+                "error_rate": self.errors / max(self.completed, 1),
+                "latency": self.latency,
+            }
+
+
+class HttpClient:
+    def __init__(self, pool_size=10, connect_timeout=5, read_timeout=30, retries=4, backoff=0.5, max_backoff=30, rate=None, burst=None):
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.pool_size = 0
+        self.resize(pool_size)
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # 호스트별 초당 요청 수 제한. None 이면 제한 없이 AdaptiveLimiter 의 동시 요청 수만 따른다
+        self.rate = rate
+        self.burst = burst
+        self.fixed_rates = set()
+        self.min_limit = 2
+        self.max_limit = 32
+        # 지금 받는 중인 Downloader 들이 요청한 (최소, 최대) 동시 요청 수
+        self.bounds = []
+        self.buckets = {}
+        self.limiters = {}
+        self.buckets_lock = threading.Lock()
+
+    def resize(self, pool_size):
+        # 풀 크기가 동시 작업 수보다 작으면 연결이 버려지므로 어댑터를 새로 붙인다
+        if pool_size <= self.pool_size:
+            return
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool_size = pool_size
+
+    def set_rate(self, host, rate, burst):
+        with self.buckets_lock:
+            self.buckets[host] = TokenBucket(rate, burst)
+            self.fixed_rates.add(host)
+
+    def set_default_rate(self, rate, burst=None):
+        # set_rate 로 따로 정한 호스트를 뺀 모든 호스트에 적용. rate 가 None/0 이면 제한하지 않는다
+        with self.buckets_lock:
+            self.rate = rate or None
+            self.burst = max(1, burst or (self.rate or 0) * 2) if self.rate else None
+            self.buckets = {host: bucket for host, bucket in self.buckets.items() if host in self.fixed_rates}
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        with self.buckets_lock:
+            bucket = self.buckets.get(host)
+            if bucket is None and self.rate:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def limiter(self, url):
+        host = urlsplit(url).netloc
+        with self.buckets_lock:
+            if host not in self.limiters:
+                self.limiters[host] = AdaptiveLimiter(self.min_limit, self.max_limit)
+            return self.limiters[host]
+
+    @contextmanager
+    def concurrency(self, min_limit, max_limit):
+        # 호스트별 limiter 는 여러 Downloader 가 같이 쓰므로 서로 덮어쓰지 않고
+        # 받는 중인 것들의 범위를 모두 아우르게 한다 (각자의 상한은 Downloader 의 스레드 수)
+        bounds = (min_limit, max_limit)
+        with self.buckets_lock:
+            self.bounds.append(bounds)
+        self.apply_bounds()
+        try:
+            yield
+        finally:
+            with self.buckets_lock:
+                self.bounds.remove(bounds)
+            self.apply_bounds()
+
+    def apply_bounds(self):
+        with self.buckets_lock:
+            if not self.bounds:
+                return
+            self.min_limit = max(low for low, _ in self.bounds)
+            self.max_limit = max(high for _, high in self.bounds)
+            limiters = list(self.limiters.values())
+        self.resize(self.max_limit)
+        for limiter in limiters:
+            limiter.set_bounds(self.min_limit, self.max_limit)
+
+    def backoff_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(self.max_backoff, int(retry_after))
+        # 지수 백오프 + full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        kind = request_kind(url)
+        attempt = 0
+        while True:
+            if attempt:
+                RETRIES.inc(kind=kind)
+            bucket = self.bucket(url)
+            if bucket is not None:
+                bucket.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                REQUEST_ERRORS.inc(kind=kind, reason=type(e).__name__)
+                self.limiter(url).record_error()
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                elapsed = time.perf_counter() - started
+                REQUEST_SECONDS.observe(elapsed, kind=kind)
+                if response.status_code not in RETRY_STATUS:
+                    self.limiter(url).observe(elapsed)
+                    return response
+                REQUEST_ERRORS.inc(kind=kind, reason=str(response.status_code))
+                self.limiter(url).record_error()
+                if attempt >= self.retries:
+                    return response
+                delay = self.backoff_delay(attempt, response)
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(pool_size=None):
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        if pool_size:
+            _client.resize(pool_size)
+        return _client
+
+
+def limiter_samples(field):
+    client = _client
+    if client is None:
+        return []
+    with client.buckets_lock:
+        limiters = list(client.limiters.items())
+    return [({"host": host}, limiter.stats()[field]) for host, limiter in limiters]
+
+
+HTTP_ACTIVE.collect = lambda: limiter_samples("active")
+HTTP_LIMIT.collect = lambda: limiter_samples("limit")
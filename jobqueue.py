@@ -0,0 +1,125 @@
+import json
+import os
+import time
+
+from appdata import APP_DIR, atomic_write_json
+
+JOBS_NAME = "jobs.json"
+JOBS_VERSION = 1
+
+# 숫자가 작을수록 먼저 받는다
+PRIORITY_READER = 0
+PRIORITY_READAHEAD = 5
+PRIORITY_BULK = 10
+# 받지 못한 회차는 이만큼 (실행을 넘겨서) 다시 시도한 뒤에 목록에서 뺀다
+MAX_ATTEMPTS = 3
+
+
+def job_key(save_dir, title_id, episode):
+    return os.path.normpath(save_dir), str(title_id), int(episode)
+
+
+class JobQueue:
+    # 받아야 할 회차를 (저장 폴더, titleId, 회차) 하나당 한 줄로 들고 있는 우선순위 큐
+    # persist 인 작업(사용자가 건 범위 다운로드)만 디스크에 남겨서 다음 실행 때 이어받는다
+    def __init__(self, path=os.path.join(APP_DIR, JOBS_NAME)):
+        self.path = path
+        self.jobs = {}
+        self.running = set()
+        self.sequence = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != JOBS_VERSION:
+            return
+        for job in data.get("jobs", []):
+            key = self.add(job["save_dir"], job["title_id"], job["title"], job["episode"], job["priority"], persist=True)
+            self.jobs[key]["attempts"] = job.get("attempts", 0)
+
+    def save(self):
+        jobs = [
+            {key: job[key] for key in ("save_dir", "title_id", "title", "episode", "priority", "attempts")}
+            for job in sorted(self.jobs.values(), key=lambda job: job["order"])
+            if job["persist"]
+        ]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write_json(self.path, {"version": JOBS_VERSION, "jobs": jobs})
+        except OSError as e:
+            print("다운로드 목록 저장 실패:", e)
+
+    def add(self, save_dir, title_id, title, episode, priority, persist=False):
+        key = job_key(save_dir, title_id, episode)
+        job = self.jobs.get(key)
+        if job is None:
+            self.sequence += 1
+            self.jobs[key] = {
+                "save_dir": key[0], "title_id": key[1], "title": title, "episode": key[2],
+                "priority": priority, "persist": persist, "order": self.sequence, "added": time.time(),
+                "attempts": 0, "failed": False,
+            }
+            return key
+        # 같은 회차를 다시 요청하면 새로 넣지 않고 더 급한 우선순위만 반영 (이번 실행에서 실패했던 회차도 다시 시도)
+        job["priority"] = min(job["priority"], priority)
+        job["persist"] = job["persist"] or persist
+        job["failed"] = False
+        return key
+
+    def add_range(self, save_dir, title_id, title, start, end, priority, persist=False):
+        keys = [self.add(save_dir, title_id, title, episode, priority, persist) for episode in range(start, end + 1)]
+        if persist:
+            self.save()
+        return keys
+
+    def is_pending(self, save_dir, title_id, episode):
+        job = self.jobs.get(job_key(save_dir, title_id, episode))
+        return job is not None and not job["failed"]
+
+    def peek(self):
+        waiting = [job for key, job in self.jobs.items() if key not in self.running and not job["failed"]]
+        if not waiting:
+            return None
+        return min(waiting, key=lambda job: (job["priority"], job["order"]))
+
+    def take_batch(self, max_episodes):
+        # 가장 급한 회차부터, 같은 웹툰의 바로 다음 회차들을 한 번에 묶어 준다
+        first = self.peek()
+        if first is None:
+            return None, []
+        keys = []
+        episode = first["episode"]
+        while len(keys) < max_episodes:
+            key = job_key(first["save_dir"], first["title_id"], episode)
+            job = self.jobs.get(key)
+            if job is None or key in self.running or job["failed"] or job["priority"] != first["priority"]:
+                break
+            keys.append(key)
+            episode += 1
+        self.running.update(keys)
+        return first, keys
+
+    def finish(self, keys, done):
+        # done 에 든 회차만 목록에서 뺀다. 못 받은 범위 다운로드 회차는 다음 실행 때 이어받도록 남겨두고
+        # 이번 실행에서는 다시 꺼내지 않는다 (같은 회차를 다시 요청하면 그때 다시 시도)
+        persisted = False
+        for key in keys:
+            self.running.discard(key)
+            job = self.jobs.get(key)
+            if job is None:
+                continue
+            persisted = persisted or job["persist"]
+            if key in done or not job["persist"]:
+                del self.jobs[key]
+                continue
+            job["attempts"] += 1
+            job["failed"] = True
+            if job["attempts"] >= MAX_ATTEMPTS:
+                print("다운로드 포기:", key[1], key[2])
+                del self.jobs[key]
+        if persisted:
+            self.save()
@@ -0,0 +1,189 @@
+import os
+import re
+import sqlite3
+import threading
+
+from PIL import Image
+
+from episodepack import PACK_PATTERN, EpisodePack, member_path, open_pack, split_member
+
+INDEX_NAME = "library.db"
+# 같은 색인에 여러 Downloader 와 GUI 가 같이 쓰므로 잠겨 있으면 이만큼(초) 기다린다
+BUSY_TIMEOUT = 30
+TITLE_DIR_PATTERN = re.compile(r"^(?P<title>.+)_(?P<title_id>\d+)$")
+IMAGE_PATTERN = re.compile(r"^(?P<title>.+)_(?P<title_id>\d+)_(?P<episode>\d+)_(?P<index>\d+)\.(?:jpg|webp)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    title_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    dirname TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    title_id TEXT NOT NULL,
+    episode INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    digest TEXT,
+    PRIMARY KEY (title_id, episode, idx)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def image_header_size(path):
+    member = split_member(path)
+    if member is not None:
+        try:
+            return open_pack(member[0]).size(member[1])
+        except (OSError, ValueError, IndexError):
+            return None, None
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except OSError:
+        return None, None
+
+
+class LibraryIndex:
+    # 저장 폴더 하나에 대한 제목/회차/이미지 목록 (경로는 저장 폴더 기준 상대 경로)
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, INDEX_NAME)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 에서는 NORMAL 로도 깨지지 않고, 이미지마다 커밋해도 fsync 를 매번 하지 않는다
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # 스키마 변경과 첫 스캔은 쓰기 잠금을 잡고 한다. GUI 와 여러 Downloader 가 새 저장 폴더의 색인을
+        # 동시에 열어도 한 연결만 폴더를 훑고, 나머지는 끝날 때까지 기다렸다가 채워진 색인을 쓴다
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.migrate()
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'scanned'").fetchone() is None:
+                # meta 표가 없던 예전 색인은 이미 채워져 있으므로 다시 훑지 않는다
+                if self.conn.execute("SELECT 1 FROM titles LIMIT 1").fetchone() is None:
+                    self.scan()
+                self.conn.execute("INSERT INTO meta VALUES ('scanned', '1')")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            self.conn.close()
+            raise
+
+    def migrate(self):
+        # 예전 색인에는 digest 열이 없다
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(images)")}
+        if "digest" not in columns:
+            self.conn.execute("ALTER TABLE images ADD COLUMN digest TEXT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def add_title(self, title_id, title, dirname):
+        with self.lock:
+            self.insert_title(title_id, title, dirname)
+            self.conn.commit()
+
+    def insert_title(self, title_id, title, dirname):
+        self.conn.execute("INSERT OR REPLACE INTO titles VALUES (?, ?, ?)", (str(title_id), title, dirname))
+
+    def add_image(self, title_id, episode, index, path, width=None, height=None, size=None, digest=None):
+        try:
+            rel_path = os.path.relpath(path, self.root)
+        except ValueError:
+            # 다른 드라이브에 있는 객체 저장소는 절대 경로로
+            rel_path = os.path.abspath(path)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images (title_id, episode, idx, path, width, height, bytes, digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(title_id), int(episode), int(index), rel_path, width, height, size, digest),
+            )
+
+    def remove_title(self, title_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM images WHERE title_id = ?", (str(title_id),))
+            self.conn.execute("DELETE FROM titles WHERE title_id = ?", (str(title_id),))
+
+    def title_info(self, title_id):
+        with self.lock:
+            return self.conn.execute("SELECT title, dirname FROM titles WHERE title_id = ?", (str(title_id),)).fetchone()
+
+    def titles(self):
+        with self.lock:
+            return self.conn.execute("SELECT title_id, title, dirname FROM titles ORDER BY dirname").fetchall()
+
+    def episodes(self, title_id):
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT episode FROM images WHERE title_id = ? ORDER BY episode", (str(title_id),))
+            return [row[0] for row in rows]
+
+    def has_episode(self, title_id, episode):
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM images WHERE title_id = ? AND episode = ? LIMIT 1", (str(title_id), int(episode))).fetchone()
+            return row is not None
+
+    def title_bytes(self, title_id):
+        with self.lock:
+            row = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM images WHERE title_id = ?", (str(title_id),)).fetchone()
+            return row[0]
+
+    def image_rows(self, title_id, episode):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path, width, height, bytes FROM images WHERE title_id = ? AND episode = ? ORDER BY idx",
+                (str(title_id), int(episode)),
+            ).fetchall()
+        return [(os.path.join(self.root, path), width, height, size) for path, width, height, size in rows]
+
+    def digest_counts(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT digest, COUNT(*), MAX(bytes), MIN(path) FROM images WHERE digest IS NOT NULL GROUP BY digest"
+            ).fetchall()
+
+    def images(self, title_id, episode):
+        return [row[0] for row in self.image_rows(title_id, episode)]
+
+    def scan(self):
+        # 빈 색인에 기존 폴더 구조를 채워 넣는다 (지우는 행은 없다. 커밋은 부른 쪽에서)
+        for dirname in os.listdir(self.root):
+            match = TITLE_DIR_PATTERN.match(dirname)
+            if match and os.path.isdir(os.path.join(self.root, dirname)):
+                self.scan_title(dirname, match["title"], match["title_id"])
+
+    def scan_title(self, dirname, title, title_id):
+        self.insert_title(title_id, title, dirname)
+        title_dir = os.path.join(self.root, dirname)
+        for entry in os.scandir(title_dir):
+            pack = PACK_PATTERN.match(entry.name)
+            if pack and pack["title_id"] == title_id:
+                self.scan_pack(title_id, pack["episode"], entry.path)
+                continue
+            match = IMAGE_PATTERN.match(entry.name)
+            if not match or match["title_id"] != title_id:
+                continue
+            width, height = image_header_size(entry.path)
+            self.add_image(title_id, match["episode"], match["index"], entry.path, width, height, entry.stat().st_size)
+
+    def scan_pack(self, title_id, episode, path):
+        try:
+            pack = EpisodePack(path)
+        except (OSError, ValueError) as e:
+            print("episode pack 읽기 실패:", path, e)
+            return
+        with pack:
+            for i, (_, length, width, height) in enumerate(pack.entries):
+                self.add_image(title_id, episode, i + 1, member_path(path, i), width, height, length)
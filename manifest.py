@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+from appdata import atomic_write_json
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# 같은 웹툰 폴더를 여러 Downloader 가 동시에 받을 수 있으므로 manifest 파일마다 저장을 하나씩
+_save_locks = {}
+_save_locks_lock = threading.Lock()
+
+
+def save_lock(path):
+    with _save_locks_lock:
+        return _save_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+class EpisodeManifest:
+    # 웹툰 폴더마다 하나: 회차별 이미지 URL, 파일명, 크기, 완료 여부를 기록
+    def __init__(self, title_dir):
+        self.title_dir = title_dir
+        self.path = os.path.join(title_dir, MANIFEST_NAME)
+        self.lock = threading.Lock()
+        # 이 인스턴스가 바꾼 회차. 저장할 때 이 회차들만 디스크의 manifest 에 덮어쓴다
+        self.changed = set()
+        self.episodes = self.read()
+
+    def read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("episodes", {})
+
+    def save(self):
+        # 다른 Downloader 가 그사이 저장한 회차를 지우지 않도록 파일을 다시 읽어서 합친 뒤 쓴다
+        with save_lock(self.path):
+            with self.lock:
+                if not self.changed:
+                    return
+                changed = {key: self.episodes[key] for key in self.changed}
+                self.changed = set()
+            episodes = self.read()
+            episodes.update(changed)
+            try:
+                atomic_write_json(self.path, {"version": MANIFEST_VERSION, "episodes": episodes})
+            except OSError as e:
+                print("manifest 저장 실패:", e)
+                with self.lock:
+                    self.changed.update(changed)
+                return
+        with self.lock:
+            for key, entry in episodes.items():
+                if key not in self.changed:
+                    self.episodes[key] = entry
+
+    def is_complete(self, episode):
+        entry = self.episodes.get(str(episode))
+        return bool(entry and entry.get("complete"))
+
+    def images(self, episode):
+        entry = self.episodes.get(str(episode))
+        return entry["images"] if entry else None
+
+    def set_episode(self, episode, title, images):
+        with self.lock:
+            previous = {img["url"]: img for img in self.images(episode) or []}
+            entry_images = []
+            for img in images:
+                old = previous.get(img["url"])
+                done = bool(old and old["done"] and old["file"] == img["file"])
+                size = old["size"] if done else None
+                if not done:
+                    # manifest 이전에 받아둔 파일은 그대로 완료 처리
+                    path = os.path.join(self.title_dir, img["file"])
+                    if os.path.isfile(path) and os.path.getsize(path) > 0:
+                        done, size = True, os.path.getsize(path)
+                entry_images.append({"url": img["url"], "file": img["file"], "size": size, "done": done})
+            self.episodes[str(episode)] = {
+                "title": title,
+                "images": entry_images,
+                "complete": all(img["done"] for img in entry_images),
+            }
+            self.changed.add(str(episode))
+
+    def missing_images(self, episode):
+        return [(i, img) for i, img in enumerate(self.images(episode) or []) if not img["done"]]
+
+    def mark_done(self, episode, index, size):
+        with self.lock:
+            entry = self.episodes[str(episode)]
+            entry["images"][index].update(size=size, done=True)
+            entry["complete"] = all(img["done"] for img in entry["images"])
+            self.changed.add(str(episode))
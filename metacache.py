@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+from appdata import APP_DIR, atomic_write_json
+from webtoonpage import fetch_list_page
+
+METADATA_TTL = 24 * 60 * 60
+
+
+class MetadataCache:
+    # titleId 별 제목, 설명, 썸네일 URL, 가져온 시각을 디스크에 보관
+    def __init__(self, cache_dir=APP_DIR, ttl=METADATA_TTL):
+        self.path = os.path.join(cache_dir, "metadata.json")
+        self.thumbnail_dir = os.path.join(cache_dir, "thumbnails")
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        # 예전 fetch 는 og:title 을 title 에 넣었으므로 그런 항목의 제목은 버리고 다시 찾게 한다
+        for entry in self.entries.values():
+            if "thumbnail_url" in entry and "og_title" not in entry:
+                entry.pop("title", None)
+
+    def save(self):
+        with self.lock:
+            data = dict(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write_json(self.path, data)
+        except OSError as e:
+            print("메타데이터 캐시 저장 실패:", e)
+
+    def get(self, title_id):
+        with self.lock:
+            return self.entries.get(str(title_id))
+
+    def is_stale(self, title_id):
+        entry = self.get(title_id)
+        return entry is None or time.time() - entry.get("fetched_at", 0) > self.ttl
+
+    def put(self, title_id, **fields):
+        with self.lock:
+            entry = dict(self.entries.get(str(title_id), {}))
+            entry.update(fields)
+            entry["fetched_at"] = time.time()
+            self.entries[str(title_id)] = entry
+            return entry
+
+    def title(self, title_id):
+        entry = self.get(title_id)
+        return entry.get("title", "") if entry else ""
+
+    def set_title(self, title_id, title):
+        # 제목만 알게 된 경우. fetched_at 은 그대로 두어서 설명과 썸네일은 계속 갱신 대상으로 남는다
+        with self.lock:
+            entry = dict(self.entries.get(str(title_id), {}))
+            entry["title"] = title
+            self.entries[str(title_id)] = entry
+
+    def thumbnail_path(self, title_id):
+        return os.path.join(self.thumbnail_dir, f"{title_id}.jpg")
+
+    def fetch(self, client, title_id, thumbnail=True):
+        page = fetch_list_page(client, title_id)
+        # og:title 은 "제목 - 부제" 처럼 꾸며져 있을 수 있어 제목(a.title)과 따로 둔다
+        entry = {"og_title": page["og_title"], "description": page["og_description"], "thumbnail_url": page["og_image"]}
+        if thumbnail and page["og_image"]:
+            try:
+                thumb = client.get(page["og_image"])
+                thumb.raise_for_status()
+                os.makedirs(self.thumbnail_dir, exist_ok=True)
+                thumb_path = self.thumbnail_path(title_id)
+                with open(thumb_path + ".part", "wb") as f:
+                    f.write(thumb.content)
+                os.replace(thumb_path + ".part", thumb_path)
+            except (requests.RequestException, OSError) as e:
+                print("썸네일 캐시 실패:", e)
+        return self.put(title_id, **entry)
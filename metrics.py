@@ -0,0 +1,282 @@
+import bisect
+import os
+import threading
+import time
+
+from appdata import atomic_write_json
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(key, extra=None):
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(label_key(labels), 0)
+
+    def samples(self):
+        with self.lock:
+            return list(self.values.items())
+
+    def prometheus(self):
+        return [f"{self.name}{format_labels(key)} {value}" for key, value in self.samples()]
+
+    def snapshot(self):
+        return [{"labels": dict(key), "value": value} for key, value in self.samples()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, collect=None):
+        super().__init__(name, help_text)
+        # collect 를 주면 읽을 때마다 불러서 [(라벨 dict, 값)] 으로 채운다 (연결 수처럼 이미 다른 곳에 있는 값)
+        self.collect = collect
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[label_key(labels)] = value
+
+    def get(self, **labels):
+        if self.collect is not None:
+            self.samples()
+        return super().get(**labels)
+
+    def samples(self):
+        if self.collect is not None:
+            values = {label_key(labels): value for labels, value in self.collect()}
+            with self.lock:
+                self.values = values
+        return super().samples()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = label_key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            entry["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def samples(self):
+        with self.lock:
+            return [(key, {"counts": list(entry["counts"]), "sum": entry["sum"], "count": entry["count"]}) for key, entry in self.values.items()]
+
+    def quantile(self, q, **labels):
+        # 버킷 안에서는 고르게 퍼져 있다고 보고 어림한다
+        with self.lock:
+            entry = self.values.get(label_key(labels))
+            if entry is None or not entry["count"]:
+                return None
+            counts = list(entry["counts"])
+            total = entry["count"]
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def prometheus(self):
+        lines = []
+        for key, entry in self.samples():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(key, ('le', '+Inf'))} {entry['count']}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {entry['sum']}")
+            lines.append(f"{self.name}_count{format_labels(key)} {entry['count']}")
+        return lines
+
+    def snapshot(self):
+        return [
+            {
+                "labels": dict(key), "count": entry["count"], "sum": entry["sum"],
+                "p50": self.quantile(0.5, **dict(key)), "p95": self.quantile(0.95, **dict(key)),
+            }
+            for key, entry in self.samples()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text):
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, collect=None):
+        return self.register(Gauge(name, help_text, collect))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, buckets))
+
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+REGISTRY = Registry()
+
+# 네트워크: 요청 한 번(재시도 포함 각 시도)의 응답 헤더까지 걸린 시간. kind 는 page / image / api
+REQUEST_SECONDS = REGISTRY.histogram("atviewer_http_request_seconds", "HTTP request latency until response headers")
+REQUEST_ERRORS = REGISTRY.counter("atviewer_http_errors_total", "HTTP attempts that failed or got a retryable status")
+RETRIES = REGISTRY.counter("atviewer_http_retries_total", "HTTP retries")
+# 다운로드 엔진
+DOWNLOAD_BYTES = REGISTRY.counter("atviewer_download_bytes_total", "Image bytes saved")
+DOWNLOAD_IMAGES = REGISTRY.counter("atviewer_download_images_total", "Images saved")
+IMAGE_SECONDS = REGISTRY.histogram("atviewer_image_download_seconds", "Time to fetch and save one image")
+# queue="jobs": 스케줄러에 남은 회차, queue="tasks": Downloader 안에서 끝나지 않은 페이지/이미지 작업
+QUEUE_DEPTH = REGISTRY.gauge("atviewer_queue_depth", "Episodes or tasks waiting to download")
+ACTIVE_DOWNLOADS = REGISTRY.gauge("atviewer_active_downloads", "Running download batches")
+# 호스트별 지금 보내고 있는 요청 수와 허용된 동시 요청 수 (값은 httpclient 가 채운다)
+HTTP_ACTIVE = REGISTRY.gauge("atviewer_http_active_requests", "In-flight HTTP requests per host")
+HTTP_LIMIT = REGISTRY.gauge("atviewer_http_concurrency_limit", "Adaptive concurrency limit per host")
+# CPU / 디스크
+PARSE_SECONDS = REGISTRY.histogram("atviewer_page_parse_seconds", "Episode page parse time")
+DISK_WRITE_SECONDS = REGISTRY.histogram("atviewer_disk_write_seconds", "Time spent writing one image to disk")
+# 뷰어
+DECODE_SECONDS = REGISTRY.histogram("atviewer_decode_seconds", "Image decode time in the reader")
+CACHE_LOOKUPS = REGISTRY.counter("atviewer_cache_lookups_total", "Decoded image cache lookups by result")
+
+
+def hit_rate(cache):
+    hits = CACHE_LOOKUPS.get(cache=cache, result="hit")
+    total = hits + CACHE_LOOKUPS.get(cache=cache, result="miss")
+    return hits / total if total else None
+
+
+def milliseconds(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def summary_lines(previous=None, elapsed=None):
+    # 통계 창에 보여줄 요약. previous 는 지난번 DOWNLOAD_BYTES 값 (초당 바이트 계산용)
+    total_bytes = DOWNLOAD_BYTES.get()
+    rate = (total_bytes - previous) / elapsed if previous is not None and elapsed else 0
+    retries = sum(value for _, value in RETRIES.samples())
+    errors = sum(value for _, value in REQUEST_ERRORS.samples())
+    workers = sum(value for _, value in HTTP_ACTIVE.samples())
+    cache = hit_rate("image")
+    lines = [
+        f"받는 속도: {rate / 1024 ** 2:.2f} MB/s (누적 {total_bytes / 1024 ** 2:.1f} MB, 이미지 {DOWNLOAD_IMAGES.get()}장)",
+        f"페이지 요청: p50 {milliseconds(REQUEST_SECONDS.quantile(0.5, kind='page'))} / p95 {milliseconds(REQUEST_SECONDS.quantile(0.95, kind='page'))}",
+        f"이미지 요청: p50 {milliseconds(REQUEST_SECONDS.quantile(0.5, kind='image'))} / p95 {milliseconds(REQUEST_SECONDS.quantile(0.95, kind='image'))}",
+        f"재시도 {retries}회, 오류 {errors}회",
+        f"대기 {QUEUE_DEPTH.get(queue='jobs')}회차 / 작업 {QUEUE_DEPTH.get(queue='tasks')}개, 받는 중 {ACTIVE_DOWNLOADS.get()}묶음, 동시 요청 {workers}개",
+        f"파싱 p50 {milliseconds(PARSE_SECONDS.quantile(0.5))}, 디스크 쓰기 p50 {milliseconds(DISK_WRITE_SECONDS.quantile(0.5))}",
+        f"디코드 p50 {milliseconds(DECODE_SECONDS.quantile(0.5, cache='image'))}, 캐시 적중률 {'-' if cache is None else f'{cache:.0%}'}",
+    ]
+    return lines, total_bytes
+
+
+class MetricsExporter:
+    # path 가 .json 이면 JSON, 아니면 Prometheus 텍스트 형식으로 interval 초마다 덮어쓴다
+    def __init__(self, path, interval=10, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.previous = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.write()
+
+    def counter_rates(self, snapshot, now):
+        # 카운터마다 지난번 내보낸 뒤로 초당 증가량 (bytes/s, 재시도/s 등)
+        totals = {name: sum(sample["value"] for sample in samples) for name, samples in snapshot.items() if self.registry.metrics[name].kind == "counter"}
+        rates = {}
+        if self.previous is not None:
+            previous_time, previous_totals = self.previous
+            elapsed = max(now - previous_time, 1e-6)
+            rates = {name: (total - previous_totals.get(name, 0)) / elapsed for name, total in totals.items()}
+        self.previous = (now, totals)
+        return rates
+
+    def write(self):
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            if self.path.endswith(".json"):
+                now = time.time()
+                snapshot = self.registry.snapshot()
+                atomic_write_json(self.path, {"time": now, "metrics": snapshot, "rates": self.counter_rates(snapshot, now)})
+                return
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.registry.prometheus_text())
+                os.replace(tmp_path, self.path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except OSError as e:
+            print("통계 파일 저장 실패:", e)
@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+
+TRANSCODE_FORMATS = {"webp": ("WEBP", ".webp")}
+
+
+def process_image(part_path, path, transcode=None, quality=80, store=None):
+    # 프로세스 풀에서 실행: 받은 그대로의 파일을 끝까지 디코드해서 검사하고 크기를 읽고, 필요하면 변환해서 저장
+    # 바이트 대신 경로만 주고받아서 프로세스 사이 복사를 줄인다
+    try:
+        with Image.open(part_path) as image:
+            image.load()
+            width, height = image.size
+            data = None
+            if transcode:
+                output = BytesIO()
+                image.convert("RGB").save(output, TRANSCODE_FORMATS[transcode][0], quality=quality)
+                data = output.getvalue()
+            elif image.format != "JPEG":
+                output = BytesIO()
+                image.convert("RGB").save(output, "JPEG")
+                data = output.getvalue()
+        if store is not None:
+            if data is None:
+                with open(part_path, "rb") as f:
+                    data = f.read()
+            digest, stored_path = store.put(data, path)
+            return len(data), width, height, stored_path, digest
+        if data is not None:
+            with open(part_path, "wb") as f:
+                f.write(data)
+        os.replace(part_path, path)
+        return os.path.getsize(path), width, height, path, None
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+class PostProcessor:
+    # 다운로드 스레드와 따로 도는 CPU 단계. 기다리는 작업 수를 max_pending 으로 묶어서
+    # CPU 가 밀리면 다운로드 스레드가 submit 에서 기다린다
+    def __init__(self, workers=None, transcode=None, quality=80, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.transcode = transcode
+        self.quality = quality
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+
+    @property
+    def extension(self):
+        return TRANSCODE_FORMATS[self.transcode][1] if self.transcode else ".jpg"
+
+    def submit(self, part_path, path, store=None):
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(process_image, part_path, path, self.transcode, self.quality, store)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def close(self):
+        self.executor.shutdown()
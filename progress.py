@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+import time
+
+from appdata import atomic_write_json
+
+PROGRESS_NAME = "reading_progress.json"
+PROGRESS_VERSION = 1
+LEGACY_PROGRESS_NAME = "last_read.txt"
+
+
+def read_legacy_progress(title_dir):
+    # 예전 last_read.txt 는 "회차:이미지" 또는 "회차" 형식이 섞여 있다
+    try:
+        with open(os.path.join(title_dir, LEGACY_PROGRESS_NAME), "r") as f:
+            parts = f.read().strip().split(":")
+        episode = int(parts[0])
+        index = int(parts[1]) if len(parts) > 1 else 0
+    except (OSError, ValueError, IndexError):
+        return None
+    return episode, index
+
+
+class ProgressStore:
+    # 저장 폴더 안 모든 웹툰의 읽은 위치를 메모리에 들고 있다가 한 파일로 모아서 저장
+    def __init__(self, root):
+        self.path = os.path.join(root, PROGRESS_NAME)
+        self.lock = threading.Lock()
+        self.titles = {}
+        self.dirty = False
+        self.exists = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != PROGRESS_VERSION:
+            # 읽을 수 없는 형식이면 없는 것과 같이 보고 last_read.txt 에서 다시 옮겨온다
+            return False
+        self.titles = data.get("titles", {})
+        return True
+
+    def migrate_legacy(self, title_dirs):
+        for title_id, title_dir in title_dirs:
+            if str(title_id) in self.titles:
+                continue
+            legacy = read_legacy_progress(title_dir)
+            if legacy is not None:
+                self.set(title_id, *legacy)
+
+    def get(self, title_id):
+        with self.lock:
+            return self.titles.get(str(title_id))
+
+    def set(self, title_id, episode, index):
+        with self.lock:
+            entry = self.titles.get(str(title_id))
+            if entry and entry["episode"] == episode and entry["index"] == index:
+                return False
+            self.titles[str(title_id)] = {"episode": episode, "index": index, "updated": time.time()}
+            self.dirty = True
+            return True
+
+    def remove(self, title_id):
+        with self.lock:
+            if self.titles.pop(str(title_id), None) is not None:
+                self.dirty = True
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {"version": PROGRESS_VERSION, "titles": dict(self.titles)}
+            self.dirty = False
+        try:
+            atomic_write_json(self.path, data)
+        except OSError as e:
+            print("[경고] 이어보기 저장 실패:", e)
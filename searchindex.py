@@ -0,0 +1,70 @@
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_START = 0xAC00
+HANGUL_END = 0xD7A3
+# 초성 하나에 중성 21개 x 종성 28개
+CHOSUNG_SPAN = 21 * 28
+
+
+def chosung(text):
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_START <= code <= HANGUL_END:
+            chars.append(CHOSUNG[(code - HANGUL_START) // CHOSUNG_SPAN])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def is_chosung(term):
+    return all(ch in CHOSUNG for ch in term)
+
+
+class SearchIndex:
+    # 제목, 설명, titleId 를 소문자 문자열로 한 번만 만들어 두고 검색은 부분 문자열 비교만 한다
+    def __init__(self):
+        self.records = {}
+        self.last_terms = None
+        self.last_results = None
+
+    def add(self, title_id, title, description=""):
+        title = normalize(title)
+        text = f"{title} {normalize(description)} {title_id}"
+        self.records[str(title_id)] = (text, chosung(title).replace(" ", ""))
+        self.last_terms = None
+
+    def remove(self, title_id):
+        self.records.pop(str(title_id), None)
+        self.last_terms = None
+
+    def match(self, title_id, query):
+        record = self.records.get(str(title_id))
+        return record is not None and self.matches(record, normalize(query).split())
+
+    def matches(self, record, terms):
+        text, initials = record
+        for term in terms:
+            if term in text:
+                continue
+            # "ㄴㅎㅈ" 처럼 초성만 친 검색어는 제목의 초성과 비교
+            if is_chosung(term) and term in initials:
+                continue
+            return False
+        return True
+
+    def search(self, query):
+        terms = normalize(query).split()
+        if not terms:
+            return None
+        candidates = self.records.keys()
+        # 앞 검색어에 글자를 더 친 경우라면 앞 결과 안에서만 찾는다
+        if self.last_terms and " ".join(terms).startswith(" ".join(self.last_terms)):
+            candidates = self.last_results
+        results = {title_id for title_id in candidates if self.matches(self.records[title_id], terms)}
+        self.last_terms = terms
+        self.last_results = results
+        return results
@@ -0,0 +1,68 @@
+import hashlib
+import os
+
+from PIL import Image
+
+from appdata import APP_DIR
+
+THUMBNAIL_NAME = "thumbnail.jpg"
+THUMBNAIL_SIZE = (120, 160)
+
+
+def thumbnail_source(title_dir, metadata_cache, title_id):
+    # 다운로드할 때 받아둔 thumbnail.jpg 를 먼저 쓰고, 없으면 메타데이터 캐시의 썸네일
+    for path in (os.path.join(title_dir, THUMBNAIL_NAME), metadata_cache.thumbnail_path(title_id)):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class ThumbnailStore:
+    # 원본 썸네일을 줄인 사본을 원본 경로, mtime, 크기로 이름 붙여 보관
+    def __init__(self, cache_dir=os.path.join(APP_DIR, "thumbs"), size=THUMBNAIL_SIZE, quality=85):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.quality = quality
+
+    def key(self, source):
+        return hashlib.sha1(os.path.abspath(source).encode("utf-8")).hexdigest()[:16]
+
+    def variant_path(self, source):
+        mtime = os.stat(source).st_mtime_ns
+        width, height = self.size
+        return os.path.join(self.cache_dir, f"{self.key(source)}_{mtime}_{width}x{height}.jpg")
+
+    def get(self, source):
+        try:
+            path = self.variant_path(source)
+        except OSError:
+            return None
+        if os.path.exists(path):
+            return path
+        tmp_path = f"{path}.{os.getpid()}.part"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with Image.open(source) as image:
+                image.thumbnail(self.size)
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                image.save(tmp_path, "JPEG", quality=self.quality)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # OSError 말고도 Pillow 는 DecompressionBombError, ValueError, SyntaxError 등을 던진다
+            print("썸네일 생성 실패:", source, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        self.remove_old(source, path)
+        return path
+
+    def remove_old(self, source, keep):
+        # 원본이 바뀌어 mtime 이 달라진 예전 사본은 지운다
+        prefix = self.key(source) + "_"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name != os.path.basename(keep):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from appdata import APP_DIR, atomic_write_json
+from metrics import PARSE_SECONDS
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# 벤치마크나 테스트에서 로컬 서버로 바꿔 쓸 수 있도록
+BASE_URL = os.environ.get("ATVIEWER_BASE_URL", "https://comic.naver.com").rstrip("/")
+IMAGE_HOST = "image-comic.pstatic.net/webtoon/"
+IMAGE_MARKER = "IMAG01"
+# 웹뷰에 이미 떠 있는 페이지에서 제목을 읽을 때 쓰는 스크립트 (parse_* 와 같은 a.title)
+TITLE_SCRIPT = "(function () { var a = document.querySelector('a.title'); return a ? a.textContent.trim() : ''; })()"
+PAGES_NAME = "pages"
+PAGE_VERSION = 1
+
+
+def detail_url(title_id, episode):
+    return f"{BASE_URL}/webtoon/detail?titleId={title_id}&no={episode}"
+
+
+def list_url(title_id):
+    return f"{BASE_URL}/webtoon/list?titleId={title_id}"
+
+
+def article_list_url(title_id, page):
+    return f"{BASE_URL}/api/article/list?titleId={title_id}&page={page}"
+
+
+def page_result(title, images, meta):
+    return {
+        "title": title,
+        "images": [src for src in images if IMAGE_MARKER in src],
+        "og_title": meta.get("title", ""),
+        "og_image": meta.get("image", ""),
+        "og_description": meta.get("description", ""),
+    }
+
+
+def parse_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    title_tag = soup.find('a', class_='title')
+    img_tags = soup.select(f'img[src*="{IMAGE_HOST}"]')
+    meta = {}
+    for key in ("title", "image", "description"):
+        tag = soup.find("meta", {"property": f"og:{key}"})
+        meta[key] = tag["content"] if tag else ""
+    return page_result(title_tag.text.strip() if title_tag else "", [img['src'] for img in img_tags], meta)
+
+
+def parse_lxml(html):
+    # 필요한 태그만 xpath 로 찾는다. 결과는 parse_bs4 와 같아야 한다
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    try:
+        tree = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:
+        # 빈 문서 ("Document is empty") 는 parse_bs4 처럼 빈 결과로
+        return page_result("", [], {})
+    title_tags = tree.xpath('//a[contains(concat(" ", normalize-space(@class), " "), " title ")]')
+    images = tree.xpath(f'//img[contains(@src, "{IMAGE_HOST}")]/@src')
+    meta = {}
+    for key in ("title", "image", "description"):
+        values = tree.xpath(f'//meta[@property="og:{key}"]/@content')
+        meta[key] = values[0] if values else ""
+    return page_result(title_tags[0].text_content().strip() if title_tags else "", images, meta)
+
+
+PARSERS = {"bs4": parse_bs4}
+if lxml is not None:
+    PARSERS["lxml"] = parse_lxml
+DEFAULT_PARSER = "lxml" if lxml is not None else "bs4"
+
+
+def parse_page(html, parser=DEFAULT_PARSER):
+    return PARSERS[parser](html)
+
+
+class PageCache:
+    # 회차 페이지에서 뽑은 결과를 (titleId, 회차) 하나당 파일 하나로 보관
+    # 올라온 회차의 이미지 목록은 바뀌지 않으므로 다시 받을 때 페이지 요청과 파싱을 모두 건너뛴다
+    def __init__(self, cache_dir=os.path.join(APP_DIR, PAGES_NAME)):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.memory = {}
+
+    def path(self, title_id, episode):
+        return os.path.join(self.cache_dir, str(title_id), f"{int(episode)}.json")
+
+    def get(self, title_id, episode):
+        key = (str(title_id), int(episode))
+        with self.lock:
+            if key in self.memory:
+                return self.memory[key]
+        try:
+            with open(self.path(title_id, episode), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != PAGE_VERSION:
+            return None
+        page = data["page"]
+        with self.lock:
+            self.memory[key] = page
+        return page
+
+    def put(self, title_id, episode, page):
+        # 이미지가 없는 결과(없는 회차, 유료 회차)는 나중에 바뀔 수 있으므로 남기지 않는다
+        if not page["title"] or not page["images"]:
+            return
+        with self.lock:
+            self.memory[(str(title_id), int(episode))] = page
+        path = self.path(title_id, episode)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_json(path, {"version": PAGE_VERSION, "fetched_at": time.time(), "page": page})
+        except OSError as e:
+            print("회차 페이지 캐시 저장 실패:", e)
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
+
+
+def fetch_episode_page(client, title_id, episode, cache=None):
+    # 캐시에 있으면 네트워크 없이 돌려준다. 요청 실패는 requests.RequestException 으로 올라간다
+    cache = get_page_cache() if cache is None else cache
+    page = cache.get(title_id, episode)
+    if page is not None:
+        return page
+    url = detail_url(title_id, episode)
+    with client.limiter(url).slot():
+        response = client.get(url)
+    # 오류 페이지를 회차 페이지로 파싱해서 캐시하지 않도록
+    response.raise_for_status()
+    started = time.perf_counter()
+    page = parse_page(response.content)
+    PARSE_SECONDS.observe(time.perf_counter() - started)
+    cache.put(title_id, episode, page)
+    return page
+
+
+def fetch_list_page(client, title_id):
+    response = client.get(list_url(title_id))
+    response.raise_for_status()
+    return parse_page(response.content)
+
+
+def synthetic_detail_page(title="테스트 웹툰", title_id=1, episode=1, image_count=60, filler=400, image_root="https://"):
+    # 실제 회차 페이지와 비슷한 크기와 모양의 HTML (벤치마크용). image_root 를 바꾸면 이미지도 로컬 서버에서 받는다
+    images = "\n".join(
+        f'<img src="{image_root}{IMAGE_HOST}{title_id}/{episode}/20250101000000_{i:032x}_IMAG01_{i + 1}.jpg" alt="comic content" id="content_image_{i}">'
+        for i in range(image_count)
+    )
+    noise = "\n".join(
+        f'<div class="item item_{i}"><a href="/webtoon/list?titleId={i}" class="link"><span class="text">항목 {i}</span></a>'
+        f'<img src="https://image-comic.pstatic.net/mobilewebimg/{i}/thumb.jpg" alt=""></div>'
+        for i in range(filler)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8">
+<meta property="og:title" content="{title}">
+<meta property="og:image" content="https://image-comic.pstatic.net/webtoon/{title_id}/thumbnail/thumbnail.jpg">
+<meta property="og:description" content="{title} 설명">
+<script>window.__data = {json.dumps({"titleId": title_id, "no": episode})};</script>
+</head><body>
+<div class="header">{noise}</div>
+<div class="subject_area"><a href="/webtoon/list?titleId={title_id}" class="title">{title}</a><h2 class="episode">{episode}화</h2></div>
+<div class="wt_viewer" id="comic_view_area">{images}</div>
+<div class="footer">{noise}</div>
+</body></html>"""
+
+
+def benchmark(html, repeat):
+    results = []
+    expected = parse_bs4(html)
+    for name, parser in PARSERS.items():
+        parser(html)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            page = parser(html)
+        elapsed = (time.perf_counter() - started) / repeat
+        results.append({"parser": name, "ms": round(elapsed * 1000, 3), "same": page == expected})
+    baseline = next(result["ms"] for result in results if result["parser"] == "bs4")
+    for result in results:
+        result["speedup"] = round(baseline / result["ms"], 1) if result["ms"] else None
+    return results
+
+
+def main(argv=None):
+    # python webtoonpage.py [저장해둔 회차 HTML ...] : 파서별 회차 페이지 하나 처리 시간 비교
+    parser = argparse.ArgumentParser(description="회차 페이지 파서 벤치마크")
+    parser.add_argument("files", nargs="*", help="저장해둔 회차 페이지 HTML (없으면 만들어서 씀)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--images", type=int, default=60, help="만들어 쓰는 페이지의 이미지 수")
+    args = parser.parse_args(argv)
+    if args.files:
+        pages = []
+        for path in args.files:
+            with open(path, "rb") as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [("synthetic", synthetic_detail_page(image_count=args.images).encode("utf-8"))]
+    for name, html in pages:
+        for result in benchmark(html, args.repeat):
+            print(json.dumps(dict(result, page=name, bytes=len(html)), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()